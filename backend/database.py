@@ -17,21 +17,41 @@ from sqlalchemy import (
     DateTime,
     Time,
     Float,
-    ARRAY,
+    LargeBinary,
     ForeignKey,
     UniqueConstraint,
     PrimaryKeyConstraint,
+    Index,
 )
+from sqlalchemy import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime
 from config import config
 
 # Create database engine
-engine = create_engine(config.DATABASE_URL, echo=False)
+# Pool is sized for many concurrent verification requests; defaults
+# (pool_size=5, max_overflow=10) become the bottleneck under load.
+engine = create_engine(
+    config.DATABASE_URL,
+    echo=False,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    # Pre-ping is off: it costs a SELECT 1 round-trip on every checkout.
+    # Stale connections are handled by pool_recycle plus the periodic
+    # health check task in main.py.
+    pool_pre_ping=False,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    future=True,
+    # Larger SQL compilation cache so every hot query is compiled once
+    # and reused, not re-rendered per request
+    query_cache_size=1200,
+)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded objects readable after a commit
+# without re-querying (verify ends its read transaction before the
+# face-compare compute)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
@@ -47,11 +67,16 @@ class Student(Base):
     student_id = Column(String(20), primary_key=True)  # Frontend uses 'student_id' (USN)
     name = Column(String(255), nullable=True)
     class_name = Column(String(50), nullable=True)  # DB column for class
-    embedding = Column(ARRAY(Float), nullable=True)  # Single embedding vector
-    registered_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    embedding = Column(LargeBinary, nullable=True)  # Packed embedding (utils.pack_embedding)
+    registered_at = Column(DateTime, nullable=False, server_default=func.now())
 
     # Relationships
-    attendance_records = relationship("Attendance", back_populates="student", cascade="all, delete-orphan")
+    # passive_deletes lets the DB's ON DELETE CASCADE remove children,
+    # instead of the ORM lazy-loading every child row just to delete it
+    attendance_records = relationship(
+        "Attendance", back_populates="student",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<Student(student_id={self.student_id}, name={self.name}, class={self.class_name})>"
@@ -67,7 +92,10 @@ class Classroom(Base):
     ip = Column(String(50), nullable=False)
 
     # Relationships
-    schedules = relationship("ClassSchedule", back_populates="classroom_ref", cascade="all, delete-orphan")
+    schedules = relationship(
+        "ClassSchedule", back_populates="classroom_ref",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<Classroom(classroom={self.classroom}, ip={self.ip})>"
@@ -89,9 +117,14 @@ class ClassSchedule(Base):
     # Relationships
     classroom_ref = relationship("Classroom", back_populates="schedules")
 
-    # Composite primary key
+    # Composite primary key; classroom gets its own index since it is only
+    # a suffix of the PK and is filtered on directly (and by FK cascades).
+    # The (class_name, start_time, end_time) index serves the hot
+    # active-schedule lookup in /api/verify without touching the table.
     __table_args__ = (
         PrimaryKeyConstraint('class_name', 'subject', 'start_time', 'end_time', 'classroom'),
+        Index("ix_class_schedule_classroom", "classroom"),
+        Index("ix_class_schedule_active_lookup", "class_name", "start_time", "end_time"),
     )
 
     def __repr__(self):
@@ -135,8 +168,8 @@ class FaceEmbedding(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(String(20), ForeignKey("students.student_id", ondelete="CASCADE"), nullable=False)
     embedding_index = Column(Integer, nullable=False)
-    embedding_vector = Column(ARRAY(Float), nullable=False)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    embedding_vector = Column(LargeBinary, nullable=False)  # Packed (utils.pack_embedding)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
 
     __table_args__ = (
         UniqueConstraint("student_id", "embedding_index", name="uq_student_embedding_index"),
@@ -3,22 +3,33 @@ Main FastAPI application for the attendance system backend.
 Implements registration, verification with IP subnet checking, and admin APIs.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, Header, Request
+from fastapi import FastAPI, Depends, HTTPException, Header, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field, validator
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 from datetime import date, datetime, time
+from time import monotonic
+import asyncio
+import csv
+import hashlib
+import logging
+import os
+import threading
+import traceback
+import numpy as np
+import orjson
 import uvicorn
-import io
-import pandas as pd
 import ipaddress
 from zoneinfo import ZoneInfo
 ist = ZoneInfo("Asia/Kolkata")
 from database import (
-    get_db, Student, FaceEmbedding, Attendance, Classroom, 
-    ClassSchedule, init_database
+    get_db, Student, FaceEmbedding, Attendance, Classroom,
+    ClassSchedule, init_database, engine
 )
 from config import config
 from utils import (
@@ -28,13 +39,22 @@ from utils import (
     verify_basic_auth,
     format_similarity_scores,
     check_subnet_match,
+    normalize_embeddings,
+    pack_embedding,
+    unpack_embedding,
 )
 
+# Application logger; per-request diagnostics go to DEBUG so production
+# (INFO) skips both the formatting and the stdout contention entirely
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
+logger = logging.getLogger("attendance")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Classroom Attendance System API",
     description="Face recognition-based attendance system with IP verification",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -44,8 +64,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers cache preflight results for a day so repeat API calls
+    # skip the OPTIONS round-trip
+    max_age=86400,
 )
 
+# Attendance/student listings are highly repetitive JSON that compresses
+# 5-10x; small responses (below 1 KB) are left alone
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # ============================================================================
 # Request/Response Models - Frontend Compatible
@@ -56,13 +83,15 @@ class RegistrationRequest(BaseModel):
     student_id: str = Field(..., description="Student ID (USN)")
     embeddings: List[List[float]] = Field(..., description="List of 5 face embeddings")
 
-    @validator("student_id")
+    @field_validator("student_id")
+    @classmethod
     def validate_student_id(cls, v):
         if not config.validate_student_id(v):
-            raise ValueError(f"Invalid student ID format")
+            raise ValueError("Invalid student ID format")
         return v
 
-    @validator("embeddings")
+    @field_validator("embeddings")
+    @classmethod
     def validate_embeddings(cls, v):
         is_valid, error_msg = validate_embeddings_list(v)
         if not is_valid:
@@ -82,13 +111,15 @@ class VerificationRequest(BaseModel):
     student_id: str = Field(..., description="Student ID")
     live_embedding: List[float] = Field(..., description="Live face embedding")
 
-    @validator("student_id")
+    @field_validator("student_id")
+    @classmethod
     def validate_student_id(cls, v):
         if not config.validate_student_id(v):
-            raise ValueError(f"Invalid student ID format")
+            raise ValueError("Invalid student ID format")
         return v
 
-    @validator("live_embedding")
+    @field_validator("live_embedding")
+    @classmethod
     def validate_live_embedding(cls, v):
         is_valid, error_msg = validate_embedding(v)
         if not is_valid:
@@ -109,6 +140,27 @@ class VerificationResponse(BaseModel):
     subject: Optional[str] = None
 
 
+class IdentificationRequest(BaseModel):
+    """Request model for 1:N student identification"""
+    live_embedding: List[float] = Field(..., description="Live face embedding")
+
+    @field_validator("live_embedding")
+    @classmethod
+    def validate_live_embedding(cls, v):
+        is_valid, error_msg = validate_embedding(v)
+        if not is_valid:
+            raise ValueError(error_msg)
+        return v
+
+
+class IdentificationResponse(BaseModel):
+    """Response model for 1:N student identification"""
+    status: str
+    message: str
+    student_id: Optional[str] = None
+    similarity: Optional[float] = None
+
+
 class AttendanceRecord(BaseModel):
     """Model for attendance record"""
     student_id: str
@@ -155,16 +207,216 @@ class AttendanceCreate(BaseModel):
     attendance_percentage: Optional[float] = 0.0
 
 
+# ============================================================================
+# Embedding Cache
+# ============================================================================
+
+# With WORKERS > 1 every uvicorn worker holds a private copy of the
+# in-process caches below, and an admin write only invalidates the
+# worker that handled it. Bound how long the other workers can serve
+# stale entries by attaching a TTL to each cache in that mode; a
+# single-worker run sees every write and keeps pure invalidation-based
+# caching (no expiry).
+_CACHE_TTL = 60.0 if int(os.getenv("WORKERS", "1")) > 1 else None
+
+
+def _cache_deadline():
+    """Expiry timestamp for a new cache entry (None = never expires)"""
+    return None if _CACHE_TTL is None else monotonic() + _CACHE_TTL
+
+
+def _cache_expired(deadline) -> bool:
+    """True once a TTL-bearing cache entry has passed its deadline"""
+    return deadline is not None and deadline <= monotonic()
+
+
+# Stored embeddings per student as one contiguous (N, dim) float32 matrix,
+# ready for verify_face without re-stacking. The ID space caps the working
+# set at 421 students (~10 KB each), so an unbounded dict is fine; write
+# paths evict or refresh their student's entry. Entries are
+# (deadline, matrix) tuples.
+_embedding_cache = {}
+_embedding_cache_lock = threading.Lock()
+
+
+def _cache_embeddings(student_id: str, embeddings):
+    """Stack embeddings into a float32 matrix and cache them"""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    with _embedding_cache_lock:
+        _embedding_cache[student_id] = (_cache_deadline(), matrix)
+    return matrix
+
+
+def _invalidate_embedding_cache(student_id: str):
+    """Drop cached embeddings after an update/delete"""
+    with _embedding_cache_lock:
+        _embedding_cache.pop(student_id, None)
+
+
+# ============================================================================
+# Schedule / Classroom Caches
+# ============================================================================
+
+# Schedules and classroom IPs change rarely but are consulted on every
+# verify. Both tables are tiny, so cache them whole and rebuild lazily
+# after any admin edit.
+_schedule_cache = None          # {class_name: [ClassSchedule, ...] sorted by start_time}
+_classroom_ip_cache = None      # {classroom: ip}
+_config_cache_lock = threading.Lock()
+
+
+def _get_schedule_slots(db: Session, class_name: str):
+    """Return this class's schedule slots from the in-memory index"""
+    global _schedule_cache
+    cached = _schedule_cache
+    if cached is None or _cache_expired(cached[0]):
+        with _config_cache_lock:
+            cached = _schedule_cache
+            if cached is None or _cache_expired(cached[0]):
+                cache = {}
+                for sched in db.query(ClassSchedule).all():
+                    cache.setdefault(sched.class_name, []).append(sched)
+                for slots in cache.values():
+                    slots.sort(key=lambda s: s.start_time)
+                cached = (_cache_deadline(), cache)
+                _schedule_cache = cached
+    return cached[1].get(class_name, [])
+
+
+def _get_classroom_ip(db: Session, classroom: str):
+    """Return a classroom's IP from the in-memory map"""
+    global _classroom_ip_cache
+    cached = _classroom_ip_cache
+    if cached is None or _cache_expired(cached[0]):
+        with _config_cache_lock:
+            cached = _classroom_ip_cache
+            if cached is None or _cache_expired(cached[0]):
+                cached = (
+                    _cache_deadline(),
+                    {c.classroom: c.ip for c in db.query(Classroom).all()}
+                )
+                _classroom_ip_cache = cached
+    return cached[1].get(classroom)
+
+
+def _invalidate_config_caches():
+    """Drop schedule/classroom caches after an admin edit"""
+    global _schedule_cache, _classroom_ip_cache
+    with _config_cache_lock:
+        _schedule_cache = None
+        _classroom_ip_cache = None
+
+
+# Stats cache: COUNT(*) is a full index scan in Postgres and the admin
+# dashboard polls /api/admin/stats; counts up to a minute stale are fine
+_stats_cache = None             # (expires_at, total_students, total_attendance)
+_stats_cache_lock = threading.Lock()
+_STATS_CACHE_TTL = 60.0
+
+
+def _attendance_etag(db: Session) -> str:
+    """
+    ETag for the admin attendance listing, derived from the table.
+
+    A per-process write counter is unusable here: it resets on restart
+    (a poller holding an old tag would get a false 304 once the counter
+    climbed back), each worker would count independently under
+    WORKERS > 1, and the desktop GUI writes the table directly without
+    going through this process at all. Hashing cheap aggregates instead
+    makes the tag follow the data no matter who wrote it, for one
+    aggregate query versus streaming and serializing every row.
+    """
+    count, last_marked, percentage_sum = db.execute(text(
+        "SELECT COUNT(*), MAX(last_marked_at), "
+        "COALESCE(SUM(attendance_percentage), 0) FROM attendance"
+    )).one()
+    fingerprint = f"{count}|{last_marked}|{round(percentage_sum, 4)}"
+    return f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+
+
+# Identity index for 1:N identification: every student's averaged unit
+# embedding stacked into one matrix. At this roster size (~420 rows) an
+# exact brute-force matvec beats pulling in an ANN library.
+_identity_index = None          # (deadline, float32 matrix (N, dim), [student_id, ...])
+_identity_index_lock = threading.Lock()
+
+
+def _get_identity_index(db: Session):
+    """Return (matrix, student_ids), building the index on first use"""
+    global _identity_index
+    index = _identity_index
+    if index is None or _cache_expired(index[0]):
+        with _identity_index_lock:
+            index = _identity_index
+            if index is None or _cache_expired(index[0]):
+                rows = db.query(Student.student_id, Student.embedding).filter(
+                    Student.embedding.isnot(None)
+                ).all()
+                ids = [sid for sid, _ in rows]
+                if rows:
+                    matrix = np.stack([unpack_embedding(blob) for _, blob in rows])
+                else:
+                    matrix = np.empty((0, config.EMBEDDING_DIMENSION), dtype=np.float32)
+                index = (_cache_deadline(), matrix, ids)
+                _identity_index = index
+    return index[1], index[2]
+
+
+def _invalidate_identity_index():
+    """Drop the identity index after any student embedding change"""
+    global _identity_index
+    with _identity_index_lock:
+        _identity_index = None
+
+
 # ============================================================================
 # Startup Event
 # ============================================================================
 
+def _probe_pool():
+    """Blocking connect + SELECT 1, run off the event loop"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def _pool_health_loop(interval_seconds: int = 30):
+    """
+    Periodically validate a pooled connection in the background.
+
+    Replaces per-checkout pool_pre_ping (one SELECT 1 round-trip per
+    request) with a single cheap check every interval. The probe runs
+    in a worker thread: a slow or down database would otherwise block
+    the event loop for the full connect timeout - exactly when the
+    check matters most.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_probe_pool)
+        except Exception as e:
+            logger.warning("⚠️ Database health check failed: %s", e)
+
+
+# Strong reference to the health task: the event loop only holds tasks
+# weakly, so an unreferenced task can be garbage-collected and silently
+# stop running
+_health_task = None
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on application startup"""
+    global _health_task
     init_database()
-    print("✅ Backend started successfully")
-    print(f"🔧 Configuration: {config.get_config_summary()}")
+    _health_task = asyncio.create_task(_pool_health_loop())
+    logger.info("✅ Backend started successfully")
+    logger.info("🔧 Configuration: %s", config.get_config_summary())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Return all pooled connections to the database on shutdown"""
+    engine.dispose()
 
 
 # ============================================================================
@@ -182,45 +434,57 @@ async def register_student(
     student_id = request.student_id
 
     try:
-        import numpy as np
-        avg_embedding = np.mean(request.embeddings, axis=0).tolist()
+        # One clock read per request, reused for every timestamp below
+        now = datetime.now(ist)
+
+        # Normalize once at registration: stored unit vectors turn every
+        # later verify into a plain dot product. The average is itself
+        # re-normalized so the single-embedding fallback stays comparable.
+        embeddings = normalize_embeddings(request.embeddings)
+        avg_embedding = normalize_embeddings(embeddings.mean(axis=0))
 
         # Check if student already exists
         existing_student = db.query(Student).filter(Student.student_id == student_id).first()
         
         if existing_student:
             # Update existing student's embedding
-            existing_student.embedding = avg_embedding
-            existing_student.registered_at = datetime.now(ist)
+            existing_student.embedding = pack_embedding(avg_embedding)
+            existing_student.registered_at = now
             
-            # Delete old face embeddings
+            # Delete old face embeddings (flushed below, before re-insert)
             db.query(FaceEmbedding).filter(FaceEmbedding.student_id == student_id).delete()
-            db.flush()  # Ensure deletions are persisted
-            
+
             message = "Student embeddings updated successfully"
         else:
             # Create new student record
             new_student = Student(
                 student_id=student_id,
-                embedding=avg_embedding,
-                registered_at=datetime.now(ist)
+                embedding=pack_embedding(avg_embedding),
+                registered_at=now
             )
             db.add(new_student)
-            db.flush()  # Persist student to DB
-            
+
             message = "Student registered successfully"
 
-        # Add new face embeddings
-        for i, embedding in enumerate(request.embeddings):
-            face_embedding = FaceEmbedding(
-                student_id=student_id,
-                embedding_index=i + 1,
-                embedding_vector=embedding,
-                created_at=datetime.now(ist)
-            )
-            db.add(face_embedding)
+        # Add new face embeddings in one multi-row INSERT. Flush pending
+        # student/delete changes first: bulk_insert_mappings bypasses
+        # unit-of-work ordering, so the parent row must already exist.
+        db.flush()
+        db.bulk_insert_mappings(FaceEmbedding, [
+            {
+                "student_id": student_id,
+                "embedding_index": i + 1,
+                "embedding_vector": pack_embedding(embedding),
+                "created_at": now,
+            }
+            for i, embedding in enumerate(embeddings)
+        ])
 
         db.commit()  # Commit the entire transaction
+        # Refresh the cache directly from the request payload so the next
+        # verify doesn't even pay the DB read
+        _cache_embeddings(student_id, embeddings)
+        _invalidate_identity_index()
 
         return RegistrationResponse(
             status="success",
@@ -254,151 +518,171 @@ async def verify_attendance(
     6. Update attendance percentage
     """
     student_id = request.student_id
-    current_time = datetime.now().time()
+    # One IST clock read per request; the old naive datetime.now().time()
+    # silently used server-local time for the schedule-window match
+    now = datetime.now(ist)
+    current_time = now.time()
     
-    print("=" * 80)
-    print("🔍 ATTENDANCE VERIFICATION REQUEST")
-    print("=" * 80)
-    print(f"📋 Student ID: {student_id}")
-    print(f"⏰ Current Time: {current_time.strftime('%H:%M:%S')}")
-    print(f"🌐 Client IP: {req.client.host}")
-    print("-" * 80)
+    logger.debug("=" * 80)
+    logger.debug("🔍 ATTENDANCE VERIFICATION REQUEST")
+    logger.debug("=" * 80)
+    logger.debug("📋 Student ID: %s", student_id)
+    logger.debug("⏰ Current Time: %s", current_time.strftime('%H:%M:%S'))
+    logger.debug("🌐 Client IP: %s", req.client.host)
+    logger.debug("-" * 80)
+
+    # Only the student row needs the DB here: the active schedule and the
+    # classroom IP are resolved from the in-memory caches below
+    student = db.query(Student).filter(Student.student_id == student_id).first()
 
     # Step 1: Check if student is registered
-    print("\n[STEP 1] Checking if student is registered...")
-    student = db.query(Student).filter(Student.student_id == student_id).first()
-    
+    logger.debug("\n[STEP 1] Checking if student is registered...")
     if not student:
-        print(f"❌ Student {student_id} not found in database")
+        logger.debug("❌ Student %s not found in database", student_id)
         return VerificationResponse(
             status="not_registered",
             message="Student not registered. Please register first.",
         )
     
-    print(f"✅ Student found: {student.name or 'N/A'}")
-    print(f"   Class: {student.class_name or 'Not Set'}")
+    logger.debug("✅ Student found: %s", student.name or 'N/A')
+    logger.debug("   Class: %s", student.class_name or 'Not Set')
 
     # Step 2: Get student's class
-    print("\n[STEP 2] Validating student class assignment...")
+    logger.debug("\n[STEP 2] Validating student class assignment...")
     if not student.class_name:
-        print("❌ Student class not set")
+        logger.debug("❌ Student class not set")
         return VerificationResponse(
             status="error",
             message="Student class not set. Please update via admin panel.",
         )
     
-    print(f"✅ Student assigned to class: {student.class_name}")
+    logger.debug("✅ Student assigned to class: %s", student.class_name)
 
     # Step 3: Find active class schedule
-    print("\n[STEP 3] Finding active class schedule...")
-    print(f"   Searching for: class='{student.class_name}', time={current_time.strftime('%H:%M')}")
-    
-    active_schedule = db.query(ClassSchedule).filter(
-        ClassSchedule.class_name == student.class_name,
-        ClassSchedule.start_time <= current_time,
-        ClassSchedule.end_time >= current_time
-    ).first()
+    logger.debug("\n[STEP 3] Finding active class schedule...")
+    logger.debug("   Searching for: class='%s', time=%s", student.class_name, current_time.strftime('%H:%M'))
+
+    all_schedules = _get_schedule_slots(db, student.class_name)
+    active_schedule = next(
+        (s for s in all_schedules if s.start_time <= current_time <= s.end_time),
+        None
+    )
 
     if not active_schedule:
-        print("❌ No active class found at this time")
-        
+        logger.debug("❌ No active class found at this time")
+
         # Debug: Show all schedules for this class
-        all_schedules = db.query(ClassSchedule).filter(
-            ClassSchedule.class_name == student.class_name
-        ).all()
-        print(f"   📅 Total schedules for {student.class_name}: {len(all_schedules)}")
+        logger.debug("   📅 Total schedules for %s: %s", student.class_name, len(all_schedules))
         for sched in all_schedules:
-            print(f"      - {sched.subject}: {sched.start_time.strftime('%H:%M')} - {sched.end_time.strftime('%H:%M')} @ {sched.classroom}")
+            logger.debug("      - %s: %s - %s @ %s", sched.subject, sched.start_time.strftime('%H:%M'), sched.end_time.strftime('%H:%M'), sched.classroom)
         
         return VerificationResponse(
             status="no_active_class",
             message="No active class at this time for your section.",
         )
     
-    print(f"✅ Active class found:")
-    print(f"   Subject: {active_schedule.subject}")
-    print(f"   Time: {active_schedule.start_time.strftime('%H:%M')} - {active_schedule.end_time.strftime('%H:%M')}")
-    print(f"   Classroom: {active_schedule.classroom}")
-
-    # Step 4: Get classroom IP
-    print("\n[STEP 4] Retrieving classroom IP configuration...")
-    classroom_record = db.query(Classroom).filter(
-        Classroom.classroom == active_schedule.classroom
-    ).first()
-
-    if not classroom_record:
-        print(f"❌ Classroom '{active_schedule.classroom}' not found in database")
+    logger.debug("✅ Active class found:")
+    logger.debug("   Subject: %s", active_schedule.subject)
+    logger.debug("   Time: %s - %s", active_schedule.start_time.strftime('%H:%M'), active_schedule.end_time.strftime('%H:%M'))
+    logger.debug("   Classroom: %s", active_schedule.classroom)
+
+    # Step 4: Get classroom IP (from the in-memory map)
+    logger.debug("\n[STEP 4] Retrieving classroom IP configuration...")
+    classroom_ip = _get_classroom_ip(db, active_schedule.classroom)
+    if not classroom_ip:
+        logger.debug("❌ Classroom '%s' not found in database", active_schedule.classroom)
         return VerificationResponse(
             status="error",
             message="Classroom configuration not found.",
         )
-    
-    print(f"✅ Classroom IP: {classroom_record.ip}")
+
+    logger.debug("✅ Classroom IP: %s", classroom_ip)
 
     # Step 5: Extract request IP and verify subnet
-    print("\n[STEP 5] Verifying IP subnet match...")
+    logger.debug("\n[STEP 5] Verifying IP subnet match...")
     client_ip = req.client.host
-    print(f"   Client IP: {client_ip}")
-    print(f"   Classroom IP: {classroom_record.ip}")
+    logger.debug("   Client IP: %s", client_ip)
+    logger.debug("   Classroom IP: %s", classroom_ip)
 
     # Check subnet match
-    subnet_match = check_subnet_match(client_ip, classroom_record.ip)
-    print(f"   Subnet Match: {subnet_match}")
+    subnet_match = check_subnet_match(client_ip, classroom_ip)
+    logger.debug("   Subnet Match: %s", subnet_match)
     
     if not subnet_match:
-        print(f"❌ IP verification failed - client not in classroom subnet")
+        logger.debug("❌ IP verification failed - client not in classroom subnet")
         return VerificationResponse(
             status="ip_verification_failed",
             message=f"IP verification failed. You must be in {active_schedule.classroom}.",
         )
     
-    print("✅ IP verification passed")
+    logger.debug("✅ IP verification passed")
 
     # Step 6: Retrieve stored embeddings for face verification
-    print("\n[STEP 6] Retrieving stored face embeddings...")
-    stored_embeddings_records = db.query(FaceEmbedding).filter(
-        FaceEmbedding.student_id == student_id
-    ).order_by(FaceEmbedding.embedding_index).all()
-    
-    print(f"   Found {len(stored_embeddings_records)} stored embeddings (expected: {config.NUM_EMBEDDINGS})")
+    logger.debug("\n[STEP 6] Retrieving stored face embeddings...")
+    cached_entry = _embedding_cache.get(student_id)
+    stored_embeddings = (
+        cached_entry[1]
+        if cached_entry is not None and not _cache_expired(cached_entry[0])
+        else None
+    )
 
-    if len(stored_embeddings_records) != config.NUM_EMBEDDINGS:
-        print("⚠️  Incomplete embeddings, falling back to single embedding from Student table")
-        if student.embedding:
-            stored_embeddings = [student.embedding]
-            print(f"✅ Using fallback embedding (dimension: {len(student.embedding)})")
-        else:
-            print("❌ No embeddings available - registration incomplete")
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "status": "error",
-                    "message": "Incomplete registration data. Please re-register."
-                }
-            )
+    if stored_embeddings is not None:
+        logger.debug("✅ Using %s cached embeddings", len(stored_embeddings))
     else:
-        stored_embeddings = [record.embedding_vector for record in stored_embeddings_records]
-        print(f"✅ Using {len(stored_embeddings)} embeddings from FaceEmbedding table")
-        print(f"   Embedding dimensions: {[len(emb) for emb in stored_embeddings]}")
+        # Column-only query: just the packed blobs as tuples, skipping
+        # hydration of full FaceEmbedding instances
+        stored_embedding_blobs = [
+            blob for (blob,) in db.query(FaceEmbedding.embedding_vector).filter(
+                FaceEmbedding.student_id == student_id
+            ).order_by(FaceEmbedding.embedding_index)
+        ]
+
+        logger.debug("   Found %s stored embeddings (expected: %s)", len(stored_embedding_blobs), config.NUM_EMBEDDINGS)
+
+        if len(stored_embedding_blobs) != config.NUM_EMBEDDINGS:
+            logger.debug("⚠️  Incomplete embeddings, falling back to single embedding from Student table")
+            if student.embedding:
+                stored_embeddings = [unpack_embedding(student.embedding)]
+                logger.debug("✅ Using fallback embedding (dimension: %s)", len(stored_embeddings[0]))
+            else:
+                logger.debug("❌ No embeddings available - registration incomplete")
+                raise HTTPException(
+                    status_code=500,
+                    detail={
+                        "status": "error",
+                        "message": "Incomplete registration data. Please re-register."
+                    }
+                )
+        else:
+            stored_embeddings = [unpack_embedding(blob) for blob in stored_embedding_blobs]
+            logger.debug("✅ Using %s embeddings from FaceEmbedding table", len(stored_embeddings))
+            logger.debug("   Embedding dimensions: %s", [len(emb) for emb in stored_embeddings])
+
+        stored_embeddings = _cache_embeddings(student_id, stored_embeddings)
 
     # Step 7: Perform face verification
-    print("\n[STEP 7] Performing biometric face verification...")
-    print(f"   Live embedding dimension: {len(request.live_embedding)}")
-    print(f"   Comparing against {len(stored_embeddings)} stored embeddings")
+    # End the read transaction before the compute step: the face compare
+    # should not hold a DB snapshot, and the attendance update below then
+    # runs in its own short write transaction
+    db.commit()
+
+    logger.debug("\n[STEP 7] Performing biometric face verification...")
+    logger.debug("   Live embedding dimension: %s", len(request.live_embedding))
+    logger.debug("   Comparing against %s stored embeddings", len(stored_embeddings))
     
     is_verified, similarity_scores, num_matches = verify_face(
         request.live_embedding,
         stored_embeddings
     )
     
-    print(f"   Similarity scores: {[f'{score:.4f}' for score in similarity_scores]}")
-    print(f"   Matches (>= threshold): {num_matches}/{len(stored_embeddings)}")
-    print(f"   Best similarity: {max(similarity_scores) if similarity_scores else 0.0:.4f}")
-    print(f"   Verification result: {'✅ PASSED' if is_verified else '❌ FAILED'}")
+    logger.debug("   Similarity scores: %s", similarity_scores)
+    logger.debug("   Matches (>= threshold): %s/%s", num_matches, len(stored_embeddings))
+    logger.debug("   Best similarity: %.4f", float(similarity_scores.max()) if similarity_scores.size else 0.0)
+    logger.debug("   Verification result: %s", '✅ PASSED' if is_verified else '❌ FAILED')
 
     if not is_verified:
-        best_similarity = max(similarity_scores) if similarity_scores else 0.0
-        print(f"\n❌ VERIFICATION FAILED - Insufficient matches")
+        best_similarity = float(similarity_scores.max()) if similarity_scores.size else 0.0
+        logger.debug("\n❌ VERIFICATION FAILED - Insufficient matches")
         return VerificationResponse(
             status="verification_failed",
             message="Biometric verification failed",
@@ -410,10 +694,10 @@ async def verify_attendance(
         )
 
     # Step 8: Update attendance percentage
-    print("\n[STEP 8] Updating attendance record...")
+    logger.debug("\n[STEP 8] Updating attendance record...")
     try:
         subject = active_schedule.subject
-        print(f"   Subject: {subject}")
+        logger.debug("   Subject: %s", subject)
 
         # Get or create attendance record
         attendance_record = db.query(Attendance).filter(
@@ -422,7 +706,7 @@ async def verify_attendance(
         ).first()
 
         if not attendance_record:
-            print("   ℹ️  No existing record - creating new attendance record")
+            logger.debug("   ℹ️  No existing record - creating new attendance record")
             attendance_record = Attendance(
                 student_id=student_id,
                 subject=subject,
@@ -432,9 +716,9 @@ async def verify_attendance(
             )
             db.add(attendance_record)
         else:
-            print(f"   📊 Current stats: {attendance_record.attended_classes}/{attendance_record.total_classes} classes")
-            print(f"   📈 Current percentage: {attendance_record.attendance_percentage:.2f}%")
-            print(f"   🕒 Last marked: {attendance_record.last_marked_at.strftime('%Y-%m-%d %H:%M:%S') if attendance_record.last_marked_at else 'Never'}")
+            logger.debug("   📊 Current stats: %s/%s classes", attendance_record.attended_classes, attendance_record.total_classes)
+            logger.debug("   📈 Current percentage: %.2f%%", attendance_record.attendance_percentage)
+            logger.debug("   🕒 Last marked: %s", attendance_record.last_marked_at.strftime('%Y-%m-%d %H:%M:%S') if attendance_record.last_marked_at else 'Never')
 
         # Increment attendance (only once per class session)
         # Check if already marked for this session (within last 2 hours)
@@ -446,21 +730,21 @@ async def verify_attendance(
             
             # Check if last mark was today and within current class time slot
             last_marked_date = attendance_record.last_marked_at.date()
-            today = datetime.now(ist).date()
+            today = now.date()
             
-            print(f"   🕒 Last marked: {attendance_record.last_marked_at.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"   📅 Last marked date: {last_marked_date}, Today: {today}")
-            print(f"   🕐 Last marked time: {last_marked_time.strftime('%H:%M:%S')}")
-            print(f"   📚 Current class time slot: {active_schedule.start_time.strftime('%H:%M')} - {active_schedule.end_time.strftime('%H:%M')}")
+            logger.debug("   🕒 Last marked: %s", attendance_record.last_marked_at.strftime('%Y-%m-%d %H:%M:%S'))
+            logger.debug("   📅 Last marked date: %s, Today: %s", last_marked_date, today)
+            logger.debug("   🕐 Last marked time: %s", last_marked_time.strftime('%H:%M:%S'))
+            logger.debug("   📚 Current class time slot: %s - %s", active_schedule.start_time.strftime('%H:%M'), active_schedule.end_time.strftime('%H:%M'))
             
             # Check if already marked for this specific class session
             if (last_marked_date == today and 
                 active_schedule.start_time <= last_marked_time <= active_schedule.end_time):
                 
-                time_diff = datetime.now(ist) - attendance_record.last_marked_at
+                time_diff = now - attendance_record.last_marked_at
                 time_diff_minutes = time_diff.total_seconds() / 60
-                print(f"   ⏱️  Time since last mark: {time_diff_minutes:.1f} minutes")
-                print(f"   ⚠️  Already marked for this class session - skipping")
+                logger.debug("   ⏱️  Time since last mark: %.1f minutes", time_diff_minutes)
+                logger.debug("   ⚠️  Already marked for this class session - skipping")
                 
                 return VerificationResponse(
                     status="already_marked",
@@ -469,7 +753,7 @@ async def verify_attendance(
                     subject=subject
                 )
             else:
-                print(f"   ✅ Last mark was in a different time slot or day - proceeding")
+                logger.debug("   ✅ Last mark was in a different time slot or day - proceeding")
 
         # Update attendance
         old_attended = attendance_record.attended_classes
@@ -481,25 +765,25 @@ async def verify_attendance(
         attendance_record.attendance_percentage = (
             attendance_record.attended_classes / attendance_record.total_classes * 100
         )
-        attendance_record.last_marked_at = datetime.now(ist)
+        attendance_record.last_marked_at = now
         
-        print(f"   ✅ Attendance updated:")
-        print(f"      Before: {old_attended}/{old_total} ({old_percentage:.2f}%)")
-        print(f"      After:  {attendance_record.attended_classes}/{attendance_record.total_classes} ({attendance_record.attendance_percentage:.2f}%)")
+        logger.debug("   ✅ Attendance updated:")
+        logger.debug("      Before: %s/%s (%.2f%%)", old_attended, old_total, old_percentage)
+        logger.debug("      After:  %s/%s (%.2f%%)", attendance_record.attended_classes, attendance_record.total_classes, attendance_record.attendance_percentage)
 
         db.commit()
-        print("   💾 Changes committed to database")
+        logger.debug("   💾 Changes committed to database")
 
-        best_similarity = max(similarity_scores) if similarity_scores else 0.0
+        best_similarity = float(similarity_scores.max()) if similarity_scores.size else 0.0
         
-        print("\n" + "=" * 80)
-        print("✅ ATTENDANCE MARKED SUCCESSFULLY")
-        print("=" * 80)
-        print(f"Student: {student_id}")
-        print(f"Subject: {subject}")
-        print(f"Attendance: {attendance_record.attendance_percentage:.2f}%")
-        print(f"Confidence: {best_similarity:.4f}")
-        print("=" * 80 + "\n")
+        logger.debug("=" * 80)
+        logger.debug("✅ ATTENDANCE MARKED SUCCESSFULLY")
+        logger.debug("=" * 80)
+        logger.debug("Student: %s", student_id)
+        logger.debug("Subject: %s", subject)
+        logger.debug("Attendance: %.2f%%", attendance_record.attendance_percentage)
+        logger.debug("Confidence: %.4f", best_similarity)
+        logger.debug("=" * 80)
         
         return VerificationResponse(
             status="ok",
@@ -514,8 +798,7 @@ async def verify_attendance(
 
     except Exception as e:
         db.rollback()
-        print(f"\n❌ ERROR during attendance update: {str(e)}")
-        import traceback
+        logger.error("❌ ERROR during attendance update: %s", e)
         traceback.print_exc()
         raise HTTPException(
             status_code=500,
@@ -525,6 +808,44 @@ async def verify_attendance(
             }
         )
 
+@app.post("/api/identify", response_model=IdentificationResponse)
+async def identify_student(
+    request: IdentificationRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Identify a student from a live face embedding (1:N search).
+
+    Compares against every registered student's averaged embedding in a
+    single matrix-vector product over the in-memory identity index.
+    """
+    matrix, ids = _get_identity_index(db)
+    if not ids:
+        return IdentificationResponse(
+            status="not_found",
+            message="No registered students to match against"
+        )
+
+    live = normalize_embeddings(request.live_embedding)
+    scores = matrix @ live
+    best = int(np.argmax(scores))
+    best_score = float(np.clip(scores[best], 0.0, 1.0))
+
+    if best_score < config.SIMILARITY_THRESHOLD:
+        return IdentificationResponse(
+            status="not_found",
+            message="No student matched above the similarity threshold",
+            similarity=round(best_score, 2)
+        )
+
+    return IdentificationResponse(
+        status="success",
+        message="Student identified",
+        student_id=ids[best],
+        similarity=round(best_score, 2)
+    )
+
+
 # ============================================================================
 # Admin APIs - CRUD Operations
 # ============================================================================
@@ -539,6 +860,25 @@ def require_admin_auth(authorization: Optional[str] = Header(None)):
         )
 
 
+def _stream_json_array(rows):
+    """
+    Yield a JSON array one orjson-encoded row at a time.
+
+    Keeps memory flat for the admin list endpoints: rows come off a
+    batched cursor and are serialized individually instead of building
+    the full list of dicts before encoding.
+    """
+    yield b"["
+    first = True
+    for row in rows:
+        if first:
+            first = False
+        else:
+            yield b","
+        yield orjson.dumps(row)
+    yield b"]"
+
+
 # Student CRUD
 @app.get("/api/admin/students")
 async def get_students(
@@ -546,16 +886,20 @@ async def get_students(
     _auth: None = Depends(require_admin_auth)
 ):
     """Get all students"""
-    students = db.query(Student).all()
-    return [
+    # Select only the listed columns: rows come back as C-level tuples
+    # (no ORM instance per row) and the embedding blob is never fetched
+    rows = db.query(
+        Student.student_id, Student.name, Student.class_name, Student.registered_at
+    ).yield_per(500)
+    return StreamingResponse(_stream_json_array(
         {
-            "student_id": s.student_id,
-            "name": s.name,
-            "class_name": s.class_name,
-            "registered_at": s.registered_at.isoformat() if s.registered_at else None
+            "student_id": student_id,
+            "name": name,
+            "class_name": class_name,
+            "registered_at": registered_at.isoformat() if registered_at else None
         }
-        for s in students
-    ]
+        for student_id, name, class_name, registered_at in rows
+    ), media_type="application/json")
 
 
 @app.post("/api/admin/students")
@@ -573,11 +917,12 @@ async def create_student(
         student_id=student.student_id,
         name=student.name,
         class_name=student.class_name,
-        embedding=student.embedding,
+        embedding=pack_embedding(normalize_embeddings(student.embedding)) if student.embedding is not None else None,
         registered_at=datetime.now(ist)
     )
     db.add(new_student)
     db.commit()
+    _invalidate_identity_index()
     return {"status": "success", "message": "Student created"}
 
 
@@ -598,9 +943,11 @@ async def update_student(
     if student.class_name is not None:
         db_student.class_name = student.class_name
     if student.embedding is not None:
-        db_student.embedding = student.embedding
+        db_student.embedding = pack_embedding(normalize_embeddings(student.embedding))
 
     db.commit()
+    _invalidate_embedding_cache(student_id)
+    _invalidate_identity_index()
     return {"status": "success", "message": "Student updated"}
 
 
@@ -617,6 +964,8 @@ async def delete_student(
 
     db.delete(db_student)
     db.commit()
+    _invalidate_embedding_cache(student_id)
+    _invalidate_identity_index()
     return {"status": "success", "message": "Student deleted"}
 
 
@@ -627,8 +976,10 @@ async def get_classrooms(
     _auth: None = Depends(require_admin_auth)
 ):
     """Get all classrooms"""
-    classrooms = db.query(Classroom).all()
-    return [{"classroom": c.classroom, "ip": c.ip} for c in classrooms]
+    rows = db.query(Classroom.classroom, Classroom.ip).yield_per(500)
+    return StreamingResponse(_stream_json_array(
+        {"classroom": classroom, "ip": ip} for classroom, ip in rows
+    ), media_type="application/json")
 
 
 @app.post("/api/admin/classrooms")
@@ -645,6 +996,7 @@ async def create_classroom(
     new_classroom = Classroom(classroom=classroom.classroom, ip=classroom.ip)
     db.add(new_classroom)
     db.commit()
+    _invalidate_config_caches()
     return {"status": "success", "message": "Classroom created"}
 
 
@@ -662,6 +1014,7 @@ async def update_classroom(
 
     db_classroom.ip = classroom.ip
     db.commit()
+    _invalidate_config_caches()
     return {"status": "success", "message": "Classroom updated"}
 
 
@@ -678,6 +1031,7 @@ async def delete_classroom(
 
     db.delete(db_classroom)
     db.commit()
+    _invalidate_config_caches()
     return {"status": "success", "message": "Classroom deleted"}
 
 
@@ -688,8 +1042,7 @@ async def get_schedules(
     _auth: None = Depends(require_admin_auth)
 ):
     """Get all class schedules"""
-    schedules = db.query(ClassSchedule).all()
-    return [
+    return StreamingResponse(_stream_json_array(
         {
             "class_name": s.class_name,
             "subject": s.subject,
@@ -697,8 +1050,8 @@ async def get_schedules(
             "end_time": s.end_time.strftime("%H:%M"),
             "classroom": s.classroom
         }
-        for s in schedules
-    ]
+        for s in db.query(ClassSchedule).yield_per(500)
+    ), media_type="application/json")
 
 
 @app.post("/api/admin/schedules")
@@ -728,6 +1081,7 @@ async def create_schedule(
 
     try:
         db.commit()
+        _invalidate_config_caches()
         return {"status": "success", "message": "Schedule created"}
     except Exception as e:
         db.rollback()
@@ -756,18 +1110,23 @@ async def delete_schedule(
 
     db.delete(db_schedule)
     db.commit()
+    _invalidate_config_caches()
     return {"status": "success", "message": "Schedule deleted"}
 
 
 # Attendance CRUD
 @app.get("/api/admin/attendance")
 async def get_all_attendance(
+    req: Request,
     db: Session = Depends(get_db),
     _auth: None = Depends(require_admin_auth)
 ):
     """Get all attendance records"""
-    attendance = db.query(Attendance).all()
-    return [
+    etag = _attendance_etag(db)
+    if req.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return StreamingResponse(_stream_json_array(
         {
             "student_id": a.student_id,
             "subject": a.subject,
@@ -776,8 +1135,45 @@ async def get_all_attendance(
             "attended_classes": a.attended_classes,
             "last_marked_at": a.last_marked_at.isoformat() if a.last_marked_at else None
         }
-        for a in attendance
-    ]
+        for a in db.query(Attendance).yield_per(500)
+    ), media_type="application/json", headers={"ETag": etag})
+
+
+class _CSVEcho:
+    """File-like object whose write() returns the line for streaming"""
+    def write(self, value):
+        return value
+
+
+@app.get("/api/admin/attendance/export")
+async def export_attendance(
+    db: Session = Depends(get_db),
+    _auth: None = Depends(require_admin_auth)
+):
+    """Export all attendance records as CSV, streamed row by row"""
+    writer = csv.writer(_CSVEcho())
+
+    def generate():
+        yield writer.writerow([
+            "student_id", "subject", "attendance_percentage",
+            "total_classes", "attended_classes", "last_marked_at"
+        ])
+        rows = db.query(Attendance).execution_options(stream_results=True).yield_per(1000)
+        for a in rows:
+            yield writer.writerow([
+                a.student_id,
+                a.subject,
+                a.attendance_percentage,
+                a.total_classes,
+                a.attended_classes,
+                a.last_marked_at.isoformat() if a.last_marked_at else ""
+            ])
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=attendance.csv"}
+    )
 
 
 @app.post("/api/admin/attendance")
@@ -787,26 +1183,71 @@ async def create_attendance(
     _auth: None = Depends(require_admin_auth)
 ):
     """Create or update attendance record"""
-    existing = db.query(Attendance).filter(
-        Attendance.student_id == attendance.student_id,
-        Attendance.subject == attendance.subject
-    ).first()
-
-    if existing:
-        raise HTTPException(status_code=400, detail="Attendance record already exists. Use PUT to update.")
-
-    new_attendance = Attendance(
+    # Single round-trip, race-free insert: ON CONFLICT replaces the
+    # SELECT-then-INSERT pattern (which could also double-insert under
+    # concurrent requests)
+    stmt = pg_insert(Attendance).values(
         student_id=attendance.student_id,
         subject=attendance.subject,
         attendance_percentage=attendance.attendance_percentage or 0.0,
         total_classes=0,
         attended_classes=0
-    )
-    db.add(new_attendance)
+    ).on_conflict_do_nothing(index_elements=["student_id", "subject"])
+
+    result = db.execute(stmt)
     db.commit()
+
+    if result.rowcount == 0:
+        raise HTTPException(status_code=400, detail="Attendance record already exists. Use PUT to update.")
+
     return {"status": "success", "message": "Attendance record created"}
 
 
+@app.post("/api/admin/attendance/bulk")
+async def create_attendance_bulk(
+    records: List[AttendanceCreate],
+    db: Session = Depends(get_db),
+    _auth: None = Depends(require_admin_auth)
+):
+    """Upsert a batch of attendance records in one statement"""
+    if not records:
+        return {"status": "success", "message": "No records provided", "count": 0}
+
+    # Deduplicate on the conflict key (last occurrence wins): Postgres
+    # rejects an ON CONFLICT DO UPDATE statement that touches the same
+    # row twice, and a pasted class import can plausibly repeat a row
+    deduped = {
+        (record.student_id, record.subject): record for record in records
+    }.values()
+
+    # One multi-row INSERT ... ON CONFLICT and one commit for the whole
+    # batch: importing a full class costs a single round-trip and fsync
+    # instead of one transaction per record
+    stmt = pg_insert(Attendance).values([
+        {
+            "student_id": record.student_id,
+            "subject": record.subject,
+            "attendance_percentage": record.attendance_percentage or 0.0,
+            "total_classes": 0,
+            "attended_classes": 0,
+        }
+        for record in deduped
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "subject"],
+        set_={"attendance_percentage": stmt.excluded.attendance_percentage}
+    )
+
+    db.execute(stmt)
+    db.commit()
+
+    return {
+        "status": "success",
+        "message": f"Imported {len(deduped)} attendance records",
+        "count": len(deduped)
+    }
+
+
 @app.put("/api/admin/attendance/{student_id}/{subject}")
 async def update_attendance(
     student_id: str,
@@ -857,8 +1298,17 @@ async def get_statistics(
     _auth: None = Depends(require_admin_auth)
 ):
     """Get overall system statistics"""
-    total_students = db.query(Student).count()
-    total_attendance_records = db.query(Attendance).count()
+    global _stats_cache
+    cached = _stats_cache
+    if cached is None or cached[0] <= monotonic():
+        # Both counts in one round-trip via scalar subqueries
+        total_students, total_attendance = db.execute(text(
+            "SELECT (SELECT COUNT(*) FROM students), (SELECT COUNT(*) FROM attendance)"
+        )).one()
+        cached = (monotonic() + _STATS_CACHE_TTL, total_students, total_attendance)
+        with _stats_cache_lock:
+            _stats_cache = cached
+    _, total_students, total_attendance_records = cached
 
     return {
         "total_registered_students": total_students,
@@ -896,25 +1346,25 @@ async def health_check():
 # ============================================================================
 
 if __name__ == "__main__":
-    import os
-
     cert_file = os.path.join(os.path.dirname(__file__), "..", "certs", "cert.pem")
     key_file = os.path.join(os.path.dirname(__file__), "..", "certs", "key.pem")
 
+    # WORKERS > 1 scales across cores for production; the default stays a
+    # single auto-reloading dev server (uvicorn cannot combine the two).
+    # Multi-worker mode switches the in-process caches to TTL expiry so
+    # admin edits handled by one worker reach the others within
+    # _CACHE_TTL seconds.
+    workers = int(os.getenv("WORKERS", "1"))
+    run_opts = {"host": config.HOST, "port": config.PORT}
+    if workers > 1:
+        run_opts["workers"] = workers
+    else:
+        run_opts["reload"] = True
+
     if os.path.exists(cert_file) and os.path.exists(key_file):
-        uvicorn.run(
-            "main:app",
-            host=config.HOST,
-            port=config.PORT,
-            reload=True,
-            ssl_certfile=cert_file,
-            ssl_keyfile=key_file
-        )
+        run_opts["ssl_certfile"] = cert_file
+        run_opts["ssl_keyfile"] = key_file
     else:
-        print("⚠️ WARNING: SSL certificates not found!")
-        uvicorn.run(
-            "main:app",
-            host=config.HOST,
-            port=config.PORT,
-            reload=True
-        )
\ No newline at end of file
+        logger.warning("⚠️ WARNING: SSL certificates not found!")
+
+    uvicorn.run("main:app", **run_opts)
\ No newline at end of file
@@ -5,19 +5,42 @@ Allows viewing, adding, editing, and deleting records from all tables.
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import Session, scoped_session
 from datetime import datetime, time
-import json
+import orjson
 
 from database import (
-    SessionLocal, Student, Classroom, ClassSchedule, 
+    SessionLocal, Student, Classroom, ClassSchedule,
     Attendance, FaceEmbedding
 )
+from utils import normalize_embeddings, pack_embedding
+
+
+def _format_datetime(dt):
+    """Render a datetime as YYYY-MM-DD HH:MM ('' if None).
+
+    f-string over the components skips strftime's per-call format
+    parsing and locale machinery, which adds up across a full page
+    of rows.
+    """
+    if dt is None:
+        return ""
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
+
+def _format_time(t):
+    """Render a time as HH:MM (same rationale as _format_datetime)."""
+    return f"{t.hour:02d}:{t.minute:02d}"
 
 
 class AttendanceSystemGUI:
     """Main GUI application for database management"""
 
+    # Rows shown per Treeview page; keeps refreshes constant-time no
+    # matter how large the tables grow
+    PAGE_SIZE = 200
+
     def __init__(self, root):
         self.root = root
         self.root.title("Attendance System - Database Manager")
@@ -30,47 +53,235 @@ class AttendanceSystemGUI:
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        # Create tabs for each table
+        # Current page per tab, and how many rows the last load returned
+        # (a short page means we are on the last one)
+        self._page = {"students": 0, "classrooms": 0, "schedules": 0, "attendance": 0}
+        self._page_rows = {}
+
+        # Last-rendered rows per tab ({iid: values}); refreshes diff
+        # against this instead of rebuilding the whole Treeview
+        self._tree_rows = {}
+
+        # Cached form dialogs, built once and reused (see _form_dialog)
+        self._dialogs = {}
+
+        # Raw column values from the last load, keyed by primary key, so
+        # the edit dialogs prefill from memory instead of re-querying a
+        # row the grid just displayed
+        self._students_by_id = {}
+        self._classrooms_by_name = {}
+        self._attendance_by_key = {}
+
+        # Coalesced status updates (see set_status)
+        self._pending_status = None
+        self._status_scheduled = False
+
+        # Single worker thread for DB fetches so queries never block the
+        # Tk event loop; results come back via root.after (Tk widgets
+        # must only be touched from the main thread)
+        self._db_pool = ThreadPoolExecutor(max_workers=1)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # One long-lived session per thread: the Tk thread and the DB
+        # worker each reuse theirs across operations instead of
+        # constructing a fresh Session per button click. close() in the
+        # existing finally blocks just ends the transaction and returns
+        # the connection; the session object stays reusable.
+        self.session = scoped_session(SessionLocal)
+
+        # Create tabs for each table. Treeviews start empty; each tab
+        # queries the database the first time it is shown, so startup
+        # costs one query instead of four and the window paints at once.
         self.create_students_tab()
         self.create_classrooms_tab()
         self.create_schedules_tab()
         self.create_attendance_tab()
 
-        # Status bar
-
+        self._loaded_tabs = set()
+        self._tab_loaders = {
+            "Students": self.load_students,
+            "Classrooms": self.load_classrooms,
+            "Class Schedule": self.load_schedules,
+            "Attendance": self.load_attendance,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._on_tab_changed()
+
+    def _on_tab_changed(self, event=None):
+        """Load a tab's data the first time it is selected"""
+        tab_text = self.notebook.tab(self.notebook.select(), "text")
+        if tab_text not in self._loaded_tabs:
+            self._loaded_tabs.add(tab_text)
+            self._tab_loaders[tab_text]()
+
+    def _on_close(self):
+        """Stop the DB worker, release sessions, and close the window"""
+        self._db_pool.shutdown(wait=False)
+        self.session.remove()
+        self.root.destroy()
+
+    def _load_async(self, fetch, apply):
+        """Run a DB fetch on the worker thread, apply rows on the Tk thread"""
+        future = self._db_pool.submit(fetch)
+
+        def deliver(fut):
+            try:
+                rows = fut.result()
+            except Exception as e:
+                self.root.after(0, self.set_status, f"Load failed: {e}")
+                return
+            self.root.after(0, apply, rows)
+
+        future.add_done_callback(deliver)
+
+    def _sync_tree(self, tree, name, new_rows):
+        """
+        Reconcile a Treeview against new_rows ({iid: values tuple}).
+
+        Only the delta is applied - removed iids deleted, changed ones
+        updated in place, new ones inserted - so a refresh where nothing
+        changed costs no tree operations at all. A final move pass keeps
+        rows in query order.
+        """
+        old_rows = self._tree_rows.get(name, {})
+        # Hide columns while mutating so Tk does one layout pass
+        tree.configure(displaycolumns=())
+        for iid in old_rows.keys() - new_rows.keys():
+            tree.delete(iid)
+        for position, (iid, values) in enumerate(new_rows.items()):
+            if iid not in old_rows:
+                tree.insert("", tk.END, iid=iid, values=values)
+            elif old_rows[iid] != values:
+                tree.item(iid, values=values)
+            tree.move(iid, "", position)
+        tree.configure(displaycolumns="#all")
+        self._tree_rows[name] = new_rows
+
+    def _change_page(self, name, delta, loader):
+        """Flip one page backward/forward and reload that tab"""
+        if delta > 0 and self._page_rows.get(name, 0) < self.PAGE_SIZE:
+            return  # already on the last page
+        new_page = max(0, self._page[name] + delta)
+        if new_page != self._page[name]:
+            self._page[name] = new_page
+            loader()
+
+    def _add_pager(self, button_frame, name, loader):
+        """Add Prev/Next page buttons to a tab's button column"""
+        pager = tk.Frame(button_frame)
+        pager.pack(pady=5)
+        tk.Button(pager, text="< Prev", width=6,
+                  command=lambda: self._change_page(name, -1, loader)).pack(side=tk.LEFT, padx=2)
+        tk.Button(pager, text="Next >", width=6,
+                  command=lambda: self._change_page(name, 1, loader)).pack(side=tk.LEFT, padx=2)
 
     def get_db(self):
-        """Get database session"""
-        return SessionLocal()
+        """Get this thread's shared database session"""
+        return self.session()
 
     def set_status(self, message):
-        """Update status bar"""
-        self.status_bar.config(text=message)
-        self.root.update()
+        """
+        Update status bar.
+
+        Writes are coalesced onto a short after() timer instead of
+        calling root.update(), which re-enters the whole event loop on
+        every status change; rapid updates collapse into one repaint.
+        """
+        self._pending_status = message
+        if not self._status_scheduled:
+            self._status_scheduled = True
+            self.root.after(50, self._flush_status)
+
+    def _flush_status(self):
+        """Apply the most recent pending status message"""
+        self._status_scheduled = False
+        if self._pending_status is not None:
+            self.status_bar.config(text=self._pending_status)
+            self._pending_status = None
 
     # ========================================================================
     # Students Tab
     # ========================================================================
 
+    def _build_tree(self, tab, columns, width, headers=None):
+        """
+        Create a headings-only Treeview with scrollbar in one place.
+
+        All four tabs need the same widget setup; doing it here keeps the
+        create_*_tab methods to just their buttons. Columns are created
+        with stretch disabled (except the last) so Tk does not recompute
+        column widths on every insert.
+        """
+        tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
+        if headers is None:
+            headers = [col.replace("_", " ").title() for col in columns]
+        for i, (col, header) in enumerate(zip(columns, headers)):
+            tree.heading(col, text=header)
+            tree.column(col, width=width,
+                        stretch=(i == len(columns) - 1))
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        scrollbar = ttk.Scrollbar(tab, orient=tk.VERTICAL, command=tree.yview)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        tree.config(yscrollcommand=scrollbar.set)
+        return tree
+
+    def _patch_row(self, tree, name, iid, values):
+        """
+        Insert or update a single row in place after a one-row commit.
+
+        A full load_* after add/edit re-queries the whole page for a
+        change we already know; patching the Treeview (and the diff
+        cache _sync_tree reconciles against) directly skips that
+        round-trip.
+        """
+        rows = self._tree_rows.setdefault(name, {})
+        if iid in rows:
+            tree.item(iid, values=values)
+        else:
+            tree.insert("", tk.END, iid=iid, values=values)
+        rows[iid] = values
+
+    def _drop_row(self, tree, name, iid):
+        """Remove a single row in place (counterpart of _patch_row)."""
+        rows = self._tree_rows.get(name, {})
+        if iid in rows:
+            tree.delete(iid)
+            del rows[iid]
+
+    def _form_dialog(self, key, title, geometry, build):
+        """
+        Return a cached, reusable Toplevel for the given form.
+
+        Building half a dozen Labels/Entries per click adds visible
+        latency to opening a dialog, so each form is constructed once,
+        withdrawn on close, and re-shown on later opens. build(dialog)
+        runs only on first open and must attach any widgets the caller
+        resets or reads (entries, dynamic labels, the save button) as
+        attributes on the dialog.
+        """
+        dialog = self._dialogs.get(key)
+        if dialog is None:
+            dialog = tk.Toplevel(self.root)
+            dialog.title(title)
+            dialog.geometry(geometry)
+            dialog.transient(self.root)
+            # Closing the window just hides it for reuse
+            dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
+            build(dialog)
+            self._dialogs[key] = dialog
+        else:
+            dialog.deiconify()
+            dialog.lift()
+        return dialog
+
     def create_students_tab(self):
         """Create Students table management tab"""
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Students")
 
-        # Treeview
         columns = ("student_id", "name", "class_name", "registered_at")
-        self.students_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
-
-        for col in columns:
-            self.students_tree.heading(col, text=col.replace("_", " ").title())
-            self.students_tree.column(col, width=150)
-
-        self.students_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tab, orient=tk.VERTICAL, command=self.students_tree.yview)
-        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
-        self.students_tree.config(yscrollcommand=scrollbar.set)
+        self.students_tree = self._build_tree(tab, columns, width=150)
 
         # Buttons
         button_frame = tk.Frame(tab)
@@ -80,59 +291,89 @@ class AttendanceSystemGUI:
         tk.Button(button_frame, text="Add Student", command=self.add_student, width=15).pack(pady=5)
         tk.Button(button_frame, text="Edit Student", command=self.edit_student, width=15).pack(pady=5)
         tk.Button(button_frame, text="Delete Student", command=self.delete_student, width=15).pack(pady=5)
-
-        # Load initial data
-        self.load_students()
+        self._add_pager(button_frame, "students", self.load_students)
 
     def load_students(self):
-        """Load students from database"""
-        self.students_tree.delete(*self.students_tree.get_children())
+        """Load the current page of students without blocking the UI"""
+        page = self._page["students"]
+        self._load_async(lambda: self._fetch_students(page),
+                         lambda rows: self._apply_students(rows, page))
+
+    def _fetch_students(self, page):
+        """Worker-thread half: column-only page query (skips the
+        embedding blob, which can be kilobytes per student)"""
         db = self.get_db()
         try:
-            students = db.query(Student).all()
-            for student in students:
-                self.students_tree.insert("", tk.END, values=(
-                    student.student_id,
-                    student.name or "",
-                    student.class_name or "",
-                    student.registered_at.strftime("%Y-%m-%d %H:%M") if student.registered_at else ""
-                ))
-            self.set_status(f"Loaded {len(students)} students")
+            return (
+                db.query(Student.student_id, Student.name, Student.class_name,
+                         Student.registered_at)
+                .order_by(Student.student_id)
+                .limit(self.PAGE_SIZE)
+                .offset(page * self.PAGE_SIZE)
+                .all()
+            )
         finally:
             db.close()
 
+    def _apply_students(self, students, page):
+        """Tk-thread half: reconcile the students tree"""
+        new_rows = {
+            student_id: (
+                student_id,
+                name or "",
+                class_name or "",
+                _format_datetime(registered_at)
+            )
+            for student_id, name, class_name, registered_at in students
+        }
+        self._students_by_id = {
+            student_id: (name, class_name)
+            for student_id, name, class_name, _ in students
+        }
+        self._sync_tree(self.students_tree, "students", new_rows)
+        self._page_rows["students"] = len(students)
+        self.set_status(f"Loaded {len(students)} students (page {page + 1})")
+
     def add_student(self):
         """Open dialog to add new student"""
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Add Student")
-        dialog.geometry("400x250")
+        def build(dialog):
+            tk.Label(dialog, text="Student ID (USN):").grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.student_id_entry = tk.Entry(dialog, width=30)
+            dialog.student_id_entry.grid(row=0, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="Student ID (USN):").grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-        student_id_entry = tk.Entry(dialog, width=30)
-        student_id_entry.grid(row=0, column=1, padx=10, pady=5)
+            tk.Label(dialog, text="Name:").grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.name_entry = tk.Entry(dialog, width=30)
+            dialog.name_entry.grid(row=1, column=1, padx=10, pady=5)
+
+            tk.Label(dialog, text="Class:").grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.class_entry = tk.Entry(dialog, width=30)
+            dialog.class_entry.grid(row=2, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="Name:").grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-        name_entry = tk.Entry(dialog, width=30)
-        name_entry.grid(row=1, column=1, padx=10, pady=5)
+            tk.Label(dialog, text="Embedding (JSON):").grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.embedding_text = scrolledtext.ScrolledText(dialog, width=30, height=5)
+            dialog.embedding_text.grid(row=3, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="Class:").grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-        class_entry = tk.Entry(dialog, width=30)
-        class_entry.grid(row=2, column=1, padx=10, pady=5)
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=4, column=0, columnspan=2, pady=10)
 
-        tk.Label(dialog, text="Embedding (JSON):").grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
-        embedding_text = scrolledtext.ScrolledText(dialog, width=30, height=5)
-        embedding_text.grid(row=3, column=1, padx=10, pady=5)
-        embedding_text.insert(tk.END, "[]")
+        dialog = self._form_dialog("add_student", "Add Student", "400x250", build)
+        dialog.student_id_entry.delete(0, tk.END)
+        dialog.name_entry.delete(0, tk.END)
+        dialog.class_entry.delete(0, tk.END)
+        dialog.embedding_text.delete("1.0", tk.END)
+        dialog.embedding_text.insert(tk.END, "[]")
 
         def save():
-            student_id = student_id_entry.get().strip()
-            name = name_entry.get().strip() or None
-            class_name = class_entry.get().strip() or None
+            student_id = dialog.student_id_entry.get().strip()
+            name = dialog.name_entry.get().strip() or None
+            class_name = dialog.class_entry.get().strip() or None
 
             try:
-                embedding_str = embedding_text.get("1.0", tk.END).strip()
-                embedding = json.loads(embedding_str) if embedding_str != "[]" else None
-            except json.JSONDecodeError:
+                embedding_str = dialog.embedding_text.get("1.0", tk.END).strip()
+                # orjson's C parser is several times faster than json for
+                # the large embedding arrays pasted into this field
+                embedding = orjson.loads(embedding_str) if embedding_str != "[]" else None
+            except orjson.JSONDecodeError:
                 messagebox.showerror("Error", "Invalid JSON for embedding")
                 return
 
@@ -146,21 +387,24 @@ class AttendanceSystemGUI:
                     student_id=student_id,
                     name=name,
                     class_name=class_name,
-                    embedding=embedding,
-                    registered_at=datetime.utcnow()
+                    embedding=pack_embedding(normalize_embeddings(embedding)) if embedding is not None else None
                 )
                 db.add(new_student)
                 db.commit()
                 messagebox.showinfo("Success", "Student added successfully")
-                dialog.destroy()
-                self.load_students()
+                dialog.withdraw()
+                self._patch_row(self.students_tree, "students", student_id, (
+                    student_id, name or "", class_name or "",
+                    _format_datetime(datetime.now())
+                ))
+                self._students_by_id[student_id] = (name, class_name)
             except Exception as e:
                 db.rollback()
                 messagebox.showerror("Error", f"Failed to add student: {str(e)}")
             finally:
                 db.close()
 
-        tk.Button(dialog, text="Save", command=save, width=15).grid(row=4, column=0, columnspan=2, pady=10)
+        dialog.save_button.config(command=save)
 
     def edit_student(self):
         """Edit selected student"""
@@ -172,47 +416,60 @@ class AttendanceSystemGUI:
         values = self.students_tree.item(selection[0])["values"]
         student_id = values[0]
 
-        db = self.get_db()
-        try:
-            student = db.query(Student).filter(Student.student_id == student_id).first()
-            if not student:
-                messagebox.showerror("Error", "Student not found")
-                return
-
-            dialog = tk.Toplevel(self.root)
-            dialog.title("Edit Student")
-            dialog.geometry("400x250")
+        # The load already fetched these fields; prefill from the cache
+        # instead of a second round-trip for a row the grid just showed
+        if student_id not in self._students_by_id:
+            messagebox.showerror("Error", "Student not found")
+            return
+        current_name, current_class = self._students_by_id[student_id]
 
+        def build(dialog):
             tk.Label(dialog, text="Student ID:").grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-            tk.Label(dialog, text=student_id).grid(row=0, column=1, padx=10, pady=5, sticky=tk.W)
+            dialog.student_id_label = tk.Label(dialog, text="")
+            dialog.student_id_label.grid(row=0, column=1, padx=10, pady=5, sticky=tk.W)
 
             tk.Label(dialog, text="Name:").grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-            name_entry = tk.Entry(dialog, width=30)
-            name_entry.insert(0, student.name or "")
-            name_entry.grid(row=1, column=1, padx=10, pady=5)
+            dialog.name_entry = tk.Entry(dialog, width=30)
+            dialog.name_entry.grid(row=1, column=1, padx=10, pady=5)
 
             tk.Label(dialog, text="Class:").grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-            class_entry = tk.Entry(dialog, width=30)
-            class_entry.insert(0, student.class_name or "")
-            class_entry.grid(row=2, column=1, padx=10, pady=5)
+            dialog.class_entry = tk.Entry(dialog, width=30)
+            dialog.class_entry.grid(row=2, column=1, padx=10, pady=5)
 
-            def save():
-                student.name = name_entry.get().strip() or None
-                student.class_name = class_entry.get().strip() or None
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=3, column=0, columnspan=2, pady=10)
 
-                try:
-                    db.commit()
-                    messagebox.showinfo("Success", "Student updated successfully")
-                    dialog.destroy()
-                    self.load_students()
-                except Exception as e:
-                    db.rollback()
-                    messagebox.showerror("Error", f"Failed to update: {str(e)}")
+        dialog = self._form_dialog("edit_student", "Edit Student", "400x250", build)
+        dialog.student_id_label.config(text=student_id)
+        dialog.name_entry.delete(0, tk.END)
+        dialog.name_entry.insert(0, current_name or "")
+        dialog.class_entry.delete(0, tk.END)
+        dialog.class_entry.insert(0, current_class or "")
 
-            tk.Button(dialog, text="Save", command=save, width=15).grid(row=3, column=0, columnspan=2, pady=10)
+        def save():
+            new_name = dialog.name_entry.get().strip() or None
+            new_class = dialog.class_entry.get().strip() or None
+            db = self.get_db()
+            try:
+                db.query(Student).filter(Student.student_id == student_id).update({
+                    "name": new_name,
+                    "class_name": new_class,
+                }, synchronize_session=False)
+                db.commit()
+                messagebox.showinfo("Success", "Student updated successfully")
+                dialog.withdraw()
+                registered = self._tree_rows["students"][student_id][3]
+                self._patch_row(self.students_tree, "students", student_id, (
+                    student_id, new_name or "", new_class or "", registered
+                ))
+                self._students_by_id[student_id] = (new_name, new_class)
+            except Exception as e:
+                db.rollback()
+                messagebox.showerror("Error", f"Failed to update: {str(e)}")
+            finally:
+                db.close()
 
-        finally:
-            db.close()
+        dialog.save_button.config(command=save)
 
     def delete_student(self):
         """Delete selected student"""
@@ -229,12 +486,15 @@ class AttendanceSystemGUI:
 
         db = self.get_db()
         try:
-            student = db.query(Student).filter(Student.student_id == student_id).first()
-            if student:
-                db.delete(student)
-                db.commit()
+            # One DELETE statement; no need to load the row first
+            deleted = db.query(Student).filter(
+                Student.student_id == student_id
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
                 messagebox.showinfo("Success", "Student deleted")
-                self.load_students()
+                self._drop_row(self.students_tree, "students", selection[0])
+                self._students_by_id.pop(student_id, None)
         except Exception as e:
             db.rollback()
             messagebox.showerror("Error", f"Failed to delete: {str(e)}")
@@ -250,15 +510,8 @@ class AttendanceSystemGUI:
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Classrooms")
 
-        # Treeview
         columns = ("classroom", "ip")
-        self.classrooms_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
-
-        for col in columns:
-            self.classrooms_tree.heading(col, text=col.replace("_", " ").title())
-            self.classrooms_tree.column(col, width=200)
-
-        self.classrooms_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.classrooms_tree = self._build_tree(tab, columns, width=200)
 
         # Buttons
         button_frame = tk.Frame(tab)
@@ -268,41 +521,57 @@ class AttendanceSystemGUI:
         tk.Button(button_frame, text="Add Classroom", command=self.add_classroom, width=15).pack(pady=5)
         tk.Button(button_frame, text="Edit Classroom", command=self.edit_classroom, width=15).pack(pady=5)
         tk.Button(button_frame, text="Delete Classroom", command=self.delete_classroom, width=15).pack(pady=5)
-
-        self.load_classrooms()
+        self._add_pager(button_frame, "classrooms", self.load_classrooms)
 
     def load_classrooms(self):
-        """Load classrooms from database"""
-        self.classrooms_tree.delete(*self.classrooms_tree.get_children())
+        """Load the current page of classrooms without blocking the UI"""
+        page = self._page["classrooms"]
+        self._load_async(lambda: self._fetch_classrooms(page),
+                         lambda rows: self._apply_classrooms(rows, page))
+
+    def _fetch_classrooms(self, page):
+        """Worker-thread half: column-only page query"""
         db = self.get_db()
         try:
-            classrooms = db.query(Classroom).all()
-            for classroom in classrooms:
-                self.classrooms_tree.insert("", tk.END, values=(
-                    classroom.classroom,
-                    classroom.ip
-                ))
-            self.set_status(f"Loaded {len(classrooms)} classrooms")
+            return (
+                db.query(Classroom.classroom, Classroom.ip)
+                .order_by(Classroom.classroom)
+                .limit(self.PAGE_SIZE)
+                .offset(page * self.PAGE_SIZE)
+                .all()
+            )
         finally:
             db.close()
 
+    def _apply_classrooms(self, classrooms, page):
+        """Tk-thread half: reconcile the classrooms tree"""
+        new_rows = {classroom: (classroom, ip) for classroom, ip in classrooms}
+        self._classrooms_by_name = dict(classrooms)
+        self._sync_tree(self.classrooms_tree, "classrooms", new_rows)
+        self._page_rows["classrooms"] = len(classrooms)
+        self.set_status(f"Loaded {len(classrooms)} classrooms (page {page + 1})")
+
     def add_classroom(self):
         """Add new classroom"""
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Add Classroom")
-        dialog.geometry("350x150")
+        def build(dialog):
+            tk.Label(dialog, text="Classroom:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
+            dialog.classroom_entry = tk.Entry(dialog, width=25)
+            dialog.classroom_entry.grid(row=0, column=1, padx=10, pady=10)
+
+            tk.Label(dialog, text="IP Address:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
+            dialog.ip_entry = tk.Entry(dialog, width=25)
+            dialog.ip_entry.grid(row=1, column=1, padx=10, pady=10)
 
-        tk.Label(dialog, text="Classroom:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
-        classroom_entry = tk.Entry(dialog, width=25)
-        classroom_entry.grid(row=0, column=1, padx=10, pady=10)
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=2, column=0, columnspan=2, pady=10)
 
-        tk.Label(dialog, text="IP Address:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
-        ip_entry = tk.Entry(dialog, width=25)
-        ip_entry.grid(row=1, column=1, padx=10, pady=10)
+        dialog = self._form_dialog("add_classroom", "Add Classroom", "350x150", build)
+        dialog.classroom_entry.delete(0, tk.END)
+        dialog.ip_entry.delete(0, tk.END)
 
         def save():
-            classroom_name = classroom_entry.get().strip()
-            ip = ip_entry.get().strip()
+            classroom_name = dialog.classroom_entry.get().strip()
+            ip = dialog.ip_entry.get().strip()
 
             if not classroom_name or not ip:
                 messagebox.showerror("Error", "All fields are required")
@@ -314,15 +583,17 @@ class AttendanceSystemGUI:
                 db.add(new_classroom)
                 db.commit()
                 messagebox.showinfo("Success", "Classroom added")
-                dialog.destroy()
-                self.load_classrooms()
+                dialog.withdraw()
+                self._patch_row(self.classrooms_tree, "classrooms",
+                                classroom_name, (classroom_name, ip))
+                self._classrooms_by_name[classroom_name] = ip
             except Exception as e:
                 db.rollback()
                 messagebox.showerror("Error", f"Failed: {str(e)}")
             finally:
                 db.close()
 
-        tk.Button(dialog, text="Save", command=save, width=15).grid(row=2, column=0, columnspan=2, pady=10)
+        dialog.save_button.config(command=save)
 
     def edit_classroom(self):
         """Edit selected classroom"""
@@ -334,36 +605,45 @@ class AttendanceSystemGUI:
         values = self.classrooms_tree.item(selection[0])["values"]
         classroom_name = values[0]
 
-        db = self.get_db()
-        try:
-            classroom = db.query(Classroom).filter(Classroom.classroom == classroom_name).first()
-
-            dialog = tk.Toplevel(self.root)
-            dialog.title("Edit Classroom")
-            dialog.geometry("350x150")
+        current_ip = self._classrooms_by_name.get(classroom_name)
 
+        def build(dialog):
             tk.Label(dialog, text="Classroom:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
-            tk.Label(dialog, text=classroom_name).grid(row=0, column=1, padx=10, pady=10, sticky=tk.W)
+            dialog.classroom_label = tk.Label(dialog, text="")
+            dialog.classroom_label.grid(row=0, column=1, padx=10, pady=10, sticky=tk.W)
 
             tk.Label(dialog, text="IP Address:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
-            ip_entry = tk.Entry(dialog, width=25)
-            ip_entry.insert(0, classroom.ip)
-            ip_entry.grid(row=1, column=1, padx=10, pady=10)
-
-            def save():
-                classroom.ip = ip_entry.get().strip()
-                try:
-                    db.commit()
-                    messagebox.showinfo("Success", "Classroom updated")
-                    dialog.destroy()
-                    self.load_classrooms()
-                except Exception as e:
-                    db.rollback()
-                    messagebox.showerror("Error", f"Failed: {str(e)}")
-
-            tk.Button(dialog, text="Save", command=save, width=15).grid(row=2, column=0, columnspan=2, pady=10)
-        finally:
-            db.close()
+            dialog.ip_entry = tk.Entry(dialog, width=25)
+            dialog.ip_entry.grid(row=1, column=1, padx=10, pady=10)
+
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=2, column=0, columnspan=2, pady=10)
+
+        dialog = self._form_dialog("edit_classroom", "Edit Classroom", "350x150", build)
+        dialog.classroom_label.config(text=classroom_name)
+        dialog.ip_entry.delete(0, tk.END)
+        dialog.ip_entry.insert(0, current_ip or "")
+
+        def save():
+            new_ip = dialog.ip_entry.get().strip()
+            db = self.get_db()
+            try:
+                db.query(Classroom).filter(
+                    Classroom.classroom == classroom_name
+                ).update({"ip": new_ip}, synchronize_session=False)
+                db.commit()
+                messagebox.showinfo("Success", "Classroom updated")
+                dialog.withdraw()
+                self._patch_row(self.classrooms_tree, "classrooms",
+                                classroom_name, (classroom_name, new_ip))
+                self._classrooms_by_name[classroom_name] = new_ip
+            except Exception as e:
+                db.rollback()
+                messagebox.showerror("Error", f"Failed: {str(e)}")
+            finally:
+                db.close()
+
+        dialog.save_button.config(command=save)
 
     def delete_classroom(self):
         """Delete selected classroom"""
@@ -380,12 +660,14 @@ class AttendanceSystemGUI:
 
         db = self.get_db()
         try:
-            classroom = db.query(Classroom).filter(Classroom.classroom == classroom_name).first()
-            if classroom:
-                db.delete(classroom)
-                db.commit()
+            deleted = db.query(Classroom).filter(
+                Classroom.classroom == classroom_name
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
                 messagebox.showinfo("Success", "Classroom deleted")
-                self.load_classrooms()
+                self._drop_row(self.classrooms_tree, "classrooms", selection[0])
+                self._classrooms_by_name.pop(classroom_name, None)
         except Exception as e:
             db.rollback()
             messagebox.showerror("Error", f"Failed: {str(e)}")
@@ -401,15 +683,8 @@ class AttendanceSystemGUI:
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Class Schedule")
 
-        # Treeview
         columns = ("class_name", "subject", "start_time", "end_time", "classroom")
-        self.schedules_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
-
-        for col in columns:
-            self.schedules_tree.heading(col, text=col.replace("_", " ").title())
-            self.schedules_tree.column(col, width=150)
-
-        self.schedules_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.schedules_tree = self._build_tree(tab, columns, width=150)
 
         # Buttons
         button_frame = tk.Frame(tab)
@@ -418,60 +693,84 @@ class AttendanceSystemGUI:
         tk.Button(button_frame, text="Refresh", command=self.load_schedules, width=15).pack(pady=5)
         tk.Button(button_frame, text="Add Schedule", command=self.add_schedule, width=15).pack(pady=5)
         tk.Button(button_frame, text="Delete Schedule", command=self.delete_schedule, width=15).pack(pady=5)
-
-        self.load_schedules()
+        self._add_pager(button_frame, "schedules", self.load_schedules)
 
     def load_schedules(self):
-        """Load schedules from database"""
-        self.schedules_tree.delete(*self.schedules_tree.get_children())
+        """Load the current page of schedules without blocking the UI"""
+        page = self._page["schedules"]
+        self._load_async(lambda: self._fetch_schedules(page),
+                         lambda rows: self._apply_schedules(rows, page))
+
+    def _fetch_schedules(self, page):
+        """Worker-thread half: column-only page query"""
         db = self.get_db()
         try:
-            schedules = db.query(ClassSchedule).all()
-            for schedule in schedules:
-                self.schedules_tree.insert("", tk.END, values=(
-                    schedule.class_name,
-                    schedule.subject,
-                    schedule.start_time.strftime("%H:%M"),
-                    schedule.end_time.strftime("%H:%M"),
-                    schedule.classroom
-                ))
-            self.set_status(f"Loaded {len(schedules)} schedules")
+            return (
+                db.query(ClassSchedule.class_name, ClassSchedule.subject,
+                         ClassSchedule.start_time, ClassSchedule.end_time,
+                         ClassSchedule.classroom)
+                .order_by(ClassSchedule.class_name, ClassSchedule.start_time)
+                .limit(self.PAGE_SIZE)
+                .offset(page * self.PAGE_SIZE)
+                .all()
+            )
         finally:
             db.close()
 
+    def _apply_schedules(self, schedules, page):
+        """Tk-thread half: reconcile the schedules tree"""
+        new_rows = {
+            f"{class_name}|{subject}|{start_time}|{classroom}": (
+                class_name,
+                subject,
+                _format_time(start_time),
+                _format_time(end_time),
+                classroom
+            )
+            for class_name, subject, start_time, end_time, classroom in schedules
+        }
+        self._sync_tree(self.schedules_tree, "schedules", new_rows)
+        self._page_rows["schedules"] = len(schedules)
+        self.set_status(f"Loaded {len(schedules)} schedules (page {page + 1})")
+
     def add_schedule(self):
         """Add new schedule"""
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Add Class Schedule")
-        dialog.geometry("350x250")
+        def build(dialog):
+            tk.Label(dialog, text="Class:").grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.class_entry = tk.Entry(dialog, width=25)
+            dialog.class_entry.grid(row=0, column=1, padx=10, pady=5)
+
+            tk.Label(dialog, text="Subject:").grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.subject_entry = tk.Entry(dialog, width=25)
+            dialog.subject_entry.grid(row=1, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="Class:").grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-        class_entry = tk.Entry(dialog, width=25)
-        class_entry.grid(row=0, column=1, padx=10, pady=5)
+            tk.Label(dialog, text="Start Time (HH:MM):").grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.start_entry = tk.Entry(dialog, width=25)
+            dialog.start_entry.grid(row=2, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="Subject:").grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-        subject_entry = tk.Entry(dialog, width=25)
-        subject_entry.grid(row=1, column=1, padx=10, pady=5)
+            tk.Label(dialog, text="End Time (HH:MM):").grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.end_entry = tk.Entry(dialog, width=25)
+            dialog.end_entry.grid(row=3, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="Start Time (HH:MM):").grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-        start_entry = tk.Entry(dialog, width=25)
-        start_entry.grid(row=2, column=1, padx=10, pady=5)
+            tk.Label(dialog, text="Classroom:").grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
+            dialog.classroom_entry = tk.Entry(dialog, width=25)
+            dialog.classroom_entry.grid(row=4, column=1, padx=10, pady=5)
 
-        tk.Label(dialog, text="End Time (HH:MM):").grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
-        end_entry = tk.Entry(dialog, width=25)
-        end_entry.grid(row=3, column=1, padx=10, pady=5)
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=5, column=0, columnspan=2, pady=10)
 
-        tk.Label(dialog, text="Classroom:").grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
-        classroom_entry = tk.Entry(dialog, width=25)
-        classroom_entry.grid(row=4, column=1, padx=10, pady=5)
+        dialog = self._form_dialog("add_schedule", "Add Class Schedule", "350x250", build)
+        for entry in (dialog.class_entry, dialog.subject_entry, dialog.start_entry,
+                      dialog.end_entry, dialog.classroom_entry):
+            entry.delete(0, tk.END)
 
         def save():
             try:
-                class_name = class_entry.get().strip()
-                subject = subject_entry.get().strip()
-                start_str = start_entry.get().strip()
-                end_str = end_entry.get().strip()
-                classroom = classroom_entry.get().strip()
+                class_name = dialog.class_entry.get().strip()
+                subject = dialog.subject_entry.get().strip()
+                start_str = dialog.start_entry.get().strip()
+                end_str = dialog.end_entry.get().strip()
+                classroom = dialog.classroom_entry.get().strip()
 
                 start_time = datetime.strptime(start_str, "%H:%M").time()
                 end_time = datetime.strptime(end_str, "%H:%M").time()
@@ -489,12 +788,17 @@ class AttendanceSystemGUI:
                 db.close()
 
                 messagebox.showinfo("Success", "Schedule added")
-                dialog.destroy()
-                self.load_schedules()
+                dialog.withdraw()
+                self._patch_row(
+                    self.schedules_tree, "schedules",
+                    f"{class_name}|{subject}|{start_time}|{classroom}",
+                    (class_name, subject, _format_time(start_time),
+                     _format_time(end_time), classroom)
+                )
             except Exception as e:
                 messagebox.showerror("Error", f"Failed: {str(e)}")
 
-        tk.Button(dialog, text="Save", command=save, width=15).grid(row=5, column=0, columnspan=2, pady=10)
+        dialog.save_button.config(command=save)
 
     def delete_schedule(self):
         """Delete selected schedule"""
@@ -511,17 +815,15 @@ class AttendanceSystemGUI:
         db = self.get_db()
         try:
             start_time = datetime.strptime(values[2], "%H:%M").time()
-            schedule = db.query(ClassSchedule).filter(
+            deleted = db.query(ClassSchedule).filter(
                 ClassSchedule.class_name == values[0],
                 ClassSchedule.subject == values[1],
                 ClassSchedule.start_time == start_time
-            ).first()
-
-            if schedule:
-                db.delete(schedule)
-                db.commit()
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
                 messagebox.showinfo("Success", "Schedule deleted")
-                self.load_schedules()
+                self._drop_row(self.schedules_tree, "schedules", selection[0])
         except Exception as e:
             db.rollback()
             messagebox.showerror("Error", f"Failed: {str(e)}")
@@ -537,21 +839,9 @@ class AttendanceSystemGUI:
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Attendance")
 
-        # Treeview
         columns = ("student_id", "subject", "percentage", "total", "attended", "last_marked")
-        self.attendance_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
-
         headers = ["Student ID", "Subject", "Percentage", "Total Classes", "Attended", "Last Marked"]
-        for col, header in zip(columns, headers):
-            self.attendance_tree.heading(col, text=header)
-            self.attendance_tree.column(col, width=130)
-
-        self.attendance_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tab, orient=tk.VERTICAL, command=self.attendance_tree.yview)
-        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
-        self.attendance_tree.config(yscrollcommand=scrollbar.set)
+        self.attendance_tree = self._build_tree(tab, columns, width=130, headers=headers)
 
         # Buttons
         button_frame = tk.Frame(tab)
@@ -561,52 +851,80 @@ class AttendanceSystemGUI:
         tk.Button(button_frame, text="Add Record", command=self.add_attendance, width=15).pack(pady=5)
         tk.Button(button_frame, text="Edit Record", command=self.edit_attendance, width=15).pack(pady=5)
         tk.Button(button_frame, text="Delete Record", command=self.delete_attendance, width=15).pack(pady=5)
-
-        self.load_attendance()
+        self._add_pager(button_frame, "attendance", self.load_attendance)
 
     def load_attendance(self):
-        """Load attendance records from database"""
-        self.attendance_tree.delete(*self.attendance_tree.get_children())
+        """Load the current page of attendance records without blocking the UI"""
+        page = self._page["attendance"]
+        self._load_async(lambda: self._fetch_attendance(page),
+                         lambda rows: self._apply_attendance(rows, page))
+
+    def _fetch_attendance(self, page):
+        """Worker-thread half: column-only page query"""
         db = self.get_db()
         try:
-            records = db.query(Attendance).all()
-            for record in records:
-                self.attendance_tree.insert("", tk.END, values=(
-                    record.student_id,
-                    record.subject,
-                    f"{record.attendance_percentage:.2f}%",
-                    record.total_classes,
-                    record.attended_classes,
-                    record.last_marked_at.strftime("%Y-%m-%d %H:%M") if record.last_marked_at else ""
-                ))
-            self.set_status(f"Loaded {len(records)} attendance records")
+            return (
+                db.query(Attendance.student_id, Attendance.subject,
+                         Attendance.attendance_percentage, Attendance.total_classes,
+                         Attendance.attended_classes, Attendance.last_marked_at)
+                .order_by(Attendance.student_id, Attendance.subject)
+                .limit(self.PAGE_SIZE)
+                .offset(page * self.PAGE_SIZE)
+                .all()
+            )
         finally:
             db.close()
 
+    def _apply_attendance(self, records, page):
+        """Tk-thread half: reconcile the attendance tree"""
+        new_rows = {
+            f"{student_id}|{subject}": (
+                student_id,
+                subject,
+                f"{percentage:.2f}%",
+                total,
+                attended,
+                _format_datetime(last_marked_at)
+            )
+            for student_id, subject, percentage, total, attended, last_marked_at in records
+        }
+        self._attendance_by_key = {
+            (student_id, subject): percentage
+            for student_id, subject, percentage, *_ in records
+        }
+        self._sync_tree(self.attendance_tree, "attendance", new_rows)
+        self._page_rows["attendance"] = len(records)
+        self.set_status(f"Loaded {len(records)} attendance records (page {page + 1})")
+
     def add_attendance(self):
         """Add new attendance record"""
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Add Attendance Record")
-        dialog.geometry("350x200")
+        def build(dialog):
+            tk.Label(dialog, text="Student ID:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
+            dialog.student_entry = tk.Entry(dialog, width=25)
+            dialog.student_entry.grid(row=0, column=1, padx=10, pady=10)
 
-        tk.Label(dialog, text="Student ID:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
-        student_entry = tk.Entry(dialog, width=25)
-        student_entry.grid(row=0, column=1, padx=10, pady=10)
+            tk.Label(dialog, text="Subject:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
+            dialog.subject_entry = tk.Entry(dialog, width=25)
+            dialog.subject_entry.grid(row=1, column=1, padx=10, pady=10)
+
+            tk.Label(dialog, text="Percentage:").grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
+            dialog.percentage_entry = tk.Entry(dialog, width=25)
+            dialog.percentage_entry.grid(row=2, column=1, padx=10, pady=10)
 
-        tk.Label(dialog, text="Subject:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
-        subject_entry = tk.Entry(dialog, width=25)
-        subject_entry.grid(row=1, column=1, padx=10, pady=10)
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=3, column=0, columnspan=2, pady=10)
 
-        tk.Label(dialog, text="Percentage:").grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
-        percentage_entry = tk.Entry(dialog, width=25)
-        percentage_entry.insert(0, "0.0")
-        percentage_entry.grid(row=2, column=1, padx=10, pady=10)
+        dialog = self._form_dialog("add_attendance", "Add Attendance Record", "350x200", build)
+        dialog.student_entry.delete(0, tk.END)
+        dialog.subject_entry.delete(0, tk.END)
+        dialog.percentage_entry.delete(0, tk.END)
+        dialog.percentage_entry.insert(0, "0.0")
 
         def save():
-            student_id = student_entry.get().strip()
-            subject = subject_entry.get().strip()
+            student_id = dialog.student_entry.get().strip()
+            subject = dialog.subject_entry.get().strip()
             try:
-                percentage = float(percentage_entry.get().strip())
+                percentage = float(dialog.percentage_entry.get().strip())
             except ValueError:
                 messagebox.showerror("Error", "Invalid percentage")
                 return
@@ -627,15 +945,20 @@ class AttendanceSystemGUI:
                 db.add(new_record)
                 db.commit()
                 messagebox.showinfo("Success", "Attendance record added")
-                dialog.destroy()
-                self.load_attendance()
+                dialog.withdraw()
+                self._patch_row(
+                    self.attendance_tree, "attendance",
+                    f"{student_id}|{subject}",
+                    (student_id, subject, f"{percentage:.2f}%", 0, 0, "")
+                )
+                self._attendance_by_key[(student_id, subject)] = percentage
             except Exception as e:
                 db.rollback()
                 messagebox.showerror("Error", f"Failed: {str(e)}")
             finally:
                 db.close()
 
-        tk.Button(dialog, text="Save", command=save, width=15).grid(row=3, column=0, columnspan=2, pady=10)
+        dialog.save_button.config(command=save)
 
     def edit_attendance(self):
         """Edit selected attendance record"""
@@ -648,42 +971,63 @@ class AttendanceSystemGUI:
         student_id = values[0]
         subject = values[1]
 
-        db = self.get_db()
-        try:
-            record = db.query(Attendance).filter(
-                Attendance.student_id == student_id,
-                Attendance.subject == subject
-            ).first()
-
-            dialog = tk.Toplevel(self.root)
-            dialog.title("Edit Attendance Record")
-            dialog.geometry("350x200")
+        current_percentage = self._attendance_by_key.get((student_id, subject))
 
+        def build(dialog):
             tk.Label(dialog, text="Student ID:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
-            tk.Label(dialog, text=student_id).grid(row=0, column=1, padx=10, pady=10, sticky=tk.W)
+            dialog.student_id_label = tk.Label(dialog, text="")
+            dialog.student_id_label.grid(row=0, column=1, padx=10, pady=10, sticky=tk.W)
 
             tk.Label(dialog, text="Subject:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
-            tk.Label(dialog, text=subject).grid(row=1, column=1, padx=10, pady=10, sticky=tk.W)
+            dialog.subject_label = tk.Label(dialog, text="")
+            dialog.subject_label.grid(row=1, column=1, padx=10, pady=10, sticky=tk.W)
 
             tk.Label(dialog, text="Percentage:").grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
-            percentage_entry = tk.Entry(dialog, width=25)
-            percentage_entry.insert(0, str(record.attendance_percentage))
-            percentage_entry.grid(row=2, column=1, padx=10, pady=10)
-
-            def save():
-                try:
-                    record.attendance_percentage = float(percentage_entry.get().strip())
-                    db.commit()
-                    messagebox.showinfo("Success", "Record updated")
-                    dialog.destroy()
-                    self.load_attendance()
-                except Exception as e:
-                    db.rollback()
-                    messagebox.showerror("Error", f"Failed: {str(e)}")
-
-            tk.Button(dialog, text="Save", command=save, width=15).grid(row=3, column=0, columnspan=2, pady=10)
-        finally:
-            db.close()
+            dialog.percentage_entry = tk.Entry(dialog, width=25)
+            dialog.percentage_entry.grid(row=2, column=1, padx=10, pady=10)
+
+            dialog.save_button = tk.Button(dialog, text="Save", width=15)
+            dialog.save_button.grid(row=3, column=0, columnspan=2, pady=10)
+
+        dialog = self._form_dialog("edit_attendance", "Edit Attendance Record", "350x200", build)
+        dialog.student_id_label.config(text=student_id)
+        dialog.subject_label.config(text=subject)
+        dialog.percentage_entry.delete(0, tk.END)
+        dialog.percentage_entry.insert(0, str(current_percentage))
+
+        def save():
+            try:
+                new_percentage = float(dialog.percentage_entry.get().strip())
+            except ValueError:
+                messagebox.showerror("Error", "Invalid percentage")
+                return
+
+            db = self.get_db()
+            try:
+                db.query(Attendance).filter(
+                    Attendance.student_id == student_id,
+                    Attendance.subject == subject
+                ).update(
+                    {"attendance_percentage": new_percentage},
+                    synchronize_session=False
+                )
+                db.commit()
+                messagebox.showinfo("Success", "Record updated")
+                dialog.withdraw()
+                iid = selection[0]
+                _, _, _, total, attended, last_marked = self._tree_rows["attendance"][iid]
+                self._patch_row(self.attendance_tree, "attendance", iid, (
+                    student_id, subject, f"{new_percentage:.2f}%",
+                    total, attended, last_marked
+                ))
+                self._attendance_by_key[(student_id, subject)] = new_percentage
+            except Exception as e:
+                db.rollback()
+                messagebox.showerror("Error", f"Failed: {str(e)}")
+            finally:
+                db.close()
+
+        dialog.save_button.config(command=save)
 
     def delete_attendance(self):
         """Delete selected attendance record"""
@@ -701,16 +1045,15 @@ class AttendanceSystemGUI:
 
         db = self.get_db()
         try:
-            record = db.query(Attendance).filter(
+            deleted = db.query(Attendance).filter(
                 Attendance.student_id == student_id,
                 Attendance.subject == subject
-            ).first()
-
-            if record:
-                db.delete(record)
-                db.commit()
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
                 messagebox.showinfo("Success", "Record deleted")
-                self.load_attendance()
+                self._drop_row(self.attendance_tree, "attendance", selection[0])
+                self._attendance_by_key.pop((student_id, subject), None)
         except Exception as e:
             db.rollback()
             messagebox.showerror("Error", f"Failed: {str(e)}")
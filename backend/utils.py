@@ -6,10 +6,73 @@ Includes face matching logic, authentication, subnet verification, and data proc
 import numpy as np
 from typing import List, Tuple
 import base64
-import secrets
+import hashlib
+import hmac
+import logging
 import ipaddress
+from functools import lru_cache
 from config import config
 
+logger = logging.getLogger("attendance")
+
+# Admin credentials hashed once at import; auth compares fixed-length
+# digests so the constant-time comparison cost is independent of the
+# credential lengths (see verify_basic_auth)
+_ADMIN_USERNAME_HASH = hashlib.sha256(config.ADMIN_USERNAME.encode()).digest()
+_ADMIN_PASSWORD_HASH = hashlib.sha256(config.ADMIN_PASSWORD.encode()).digest()
+
+
+def pack_embedding(embedding: List[float]) -> bytes:
+    """
+    Serialize an embedding vector to compact binary (float16).
+
+    Stored as raw bytes (BYTEA) instead of a float8 array: 2 bytes per
+    element instead of 8, so 4x less disk/network bandwidth per embedding.
+
+    Args:
+        embedding: The embedding vector (list or array of floats)
+
+    Returns:
+        Raw float16 bytes
+    """
+    return np.asarray(embedding, dtype=np.float16).tobytes()
+
+
+def unpack_embedding(blob: bytes) -> np.ndarray:
+    """
+    Deserialize an embedding stored by pack_embedding.
+
+    Values are widened back to float32 so similarity math keeps full
+    precision; only storage is quantized.
+
+    Args:
+        blob: Raw float16 bytes from the database
+
+    Returns:
+        float32 numpy array
+    """
+    return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+
+def normalize_embeddings(embeddings) -> np.ndarray:
+    """
+    L2-normalize embeddings to unit length (float32).
+
+    Stored embeddings are normalized once at registration, so cosine
+    similarity at verify time reduces to a plain dot product: no norms
+    or divisions on the hot path.
+
+    Args:
+        embeddings: A single embedding vector or an (N, dim) batch
+
+    Returns:
+        float32 array of unit vectors (zero vectors pass through as-is)
+    """
+    arr = np.array(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(arr, axis=-1, keepdims=True)
+    np.divide(arr, norms, out=arr, where=norms > 0)
+    return arr
+
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
@@ -22,18 +85,23 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     Returns:
         Cosine similarity score (0 to 1, where 1 is identical)
     """
-    a = np.array(vec1)
-    b = np.array(vec2)
-
-    dot_product = np.dot(a, b)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
+    a = np.asarray(vec1, dtype=np.float32)
+    b = np.asarray(vec2, dtype=np.float32)
 
-    if norm_a == 0 or norm_b == 0:
+    # vdot of a vector with itself is its squared norm; one sqrt over the
+    # product is cheaper than two np.linalg.norm calls
+    denominator = np.sqrt(np.vdot(a, a) * np.vdot(b, b))
+    if denominator == 0:
         return 0.0
 
-    similarity = dot_product / (norm_a * norm_b)
-    return float(np.clip(similarity, 0.0, 1.0))
+    # Plain comparisons clamp a scalar cheaper than np.clip, which
+    # routes a 0-d array through NumPy's ufunc dispatch
+    similarity = float(np.dot(a, b)) / float(denominator)
+    if similarity < 0.0:
+        return 0.0
+    if similarity > 1.0:
+        return 1.0
+    return similarity
 
 
 def verify_face(
@@ -47,32 +115,40 @@ def verify_face(
 
     Args:
         live_embedding: The embedding from the live capture
-        stored_embeddings: List of stored embeddings for the student
+        stored_embeddings: Stored unit-vector embeddings for the student
+            (normalized at registration by normalize_embeddings)
         threshold: Similarity threshold (uses config default if None)
         min_matches: Minimum required matches (uses config default if None)
 
     Returns:
-        Tuple of (is_verified, similarity_scores, num_matches)
+        Tuple of (is_verified, similarity_scores ndarray, num_matches)
     """
     if threshold is None:
         threshold = config.SIMILARITY_THRESHOLD
     if min_matches is None:
         min_matches = config.MIN_MATCHES_REQUIRED
 
-    similarity_scores = []
-    for stored_embedding in stored_embeddings:
-        score = cosine_similarity(live_embedding, stored_embedding)
-        similarity_scores.append(score)
+    # Stored rows are already unit vectors, so after normalizing the live
+    # embedding once, all cosine similarities come from a single BLAS
+    # matrix-vector product - no per-row norms or divisions
+    matrix = np.asarray(stored_embeddings, dtype=np.float32)
+    live = normalize_embeddings(live_embedding)
+
+    scores = np.clip(matrix @ live, 0.0, 1.0)
 
-    num_matches = sum(1 for score in similarity_scores if score >= threshold)
+    num_matches = int((scores >= threshold).sum())
     is_verified = num_matches >= min_matches
 
-    return is_verified, similarity_scores, num_matches
+    return is_verified, scores, num_matches
 
 
 def validate_embedding(embedding: List[float]) -> Tuple[bool, str]:
     """
-    Validate an embedding vector.
+    Validate an embedding vector (list or array-like of numbers).
+
+    One numpy conversion does all the element checks: non-numeric input
+    fails the cast, and a single isfinite pass covers NaN/inf, instead
+    of a throwaway float() list plus separate isnan/isinf scans.
 
     Args:
         embedding: The embedding vector to validate
@@ -80,19 +156,15 @@ def validate_embedding(embedding: List[float]) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not isinstance(embedding, list):
-        return False, "Embedding must be a list"
-
-    if len(embedding) != config.EMBEDDING_DIMENSION:
-        return False, f"Embedding dimension must be {config.EMBEDDING_DIMENSION}, got {len(embedding)}"
-
     try:
-        _ = [float(x) for x in embedding]
+        arr = np.asarray(embedding, dtype=np.float32)
     except (ValueError, TypeError):
         return False, "All embedding elements must be numbers"
 
-    arr = np.array(embedding)
-    if np.isnan(arr).any() or np.isinf(arr).any():
+    if arr.ndim != 1 or arr.size != config.EMBEDDING_DIMENSION:
+        return False, f"Embedding dimension must be {config.EMBEDDING_DIMENSION}, got {arr.size}"
+
+    if not np.isfinite(arr).all():
         return False, "Embedding contains NaN or infinity values"
 
     return True, ""
@@ -111,6 +183,22 @@ def validate_embeddings_list(embeddings: List[List[float]]) -> Tuple[bool, str]:
     if len(embeddings) != config.NUM_EMBEDDINGS:
         return False, f"Must provide exactly {config.NUM_EMBEDDINGS} embeddings, got {len(embeddings)}"
 
+    # Fast path: one vectorized shape + finiteness check over the whole
+    # batch instead of thousands of per-element isinstance checks
+    try:
+        arr = np.asarray(embeddings, dtype=np.float32)
+    except (ValueError, TypeError):
+        arr = None
+
+    if (
+        arr is not None
+        and arr.shape == (config.NUM_EMBEDDINGS, config.EMBEDDING_DIMENSION)
+        and np.isfinite(arr).all()
+    ):
+        return True, ""
+
+    # Slow path only on invalid input: re-check per embedding to report
+    # which one failed and why
     for i, embedding in enumerate(embeddings):
         is_valid, error_msg = validate_embedding(embedding)
         if not is_valid:
@@ -119,10 +207,18 @@ def validate_embeddings_list(embeddings: List[List[float]]) -> Tuple[bool, str]:
     return True, ""
 
 
+@lru_cache(maxsize=256)
 def verify_basic_auth(authorization: str) -> bool:
     """
     Verify HTTP Basic Authentication credentials.
 
+    Cached on the raw header string: the admin dashboard polls with the
+    same header thousands of times, and repeat calls become one dict
+    lookup instead of a base64 decode plus hashing. On a cache miss the
+    supplied credentials are hashed and compared against the digests
+    precomputed at import, so the constant-time comparison always runs
+    over fixed 32-byte inputs regardless of what the client sent.
+
     Args:
         authorization: The Authorization header value (e.g., "Basic base64string")
 
@@ -140,8 +236,12 @@ def verify_basic_auth(authorization: str) -> bool:
         decoded = base64.b64decode(credentials).decode("utf-8")
         username, password = decoded.split(":", 1)
 
-        username_match = secrets.compare_digest(username, config.ADMIN_USERNAME)
-        password_match = secrets.compare_digest(password, config.ADMIN_PASSWORD)
+        username_match = hmac.compare_digest(
+            hashlib.sha256(username.encode()).digest(), _ADMIN_USERNAME_HASH
+        )
+        password_match = hmac.compare_digest(
+            hashlib.sha256(password.encode()).digest(), _ADMIN_PASSWORD_HASH
+        )
 
         return username_match and password_match
 
@@ -159,7 +259,19 @@ def format_similarity_scores(scores: List[float]) -> List[float]:
     Returns:
         List of rounded scores
     """
-    return [round(score, 2) for score in scores]
+    return np.round(np.asarray(scores, dtype=np.float64), 2).tolist()
+
+
+@lru_cache(maxsize=256)
+def _classroom_network(classroom_ip: str, subnet_mask: int):
+    """
+    Parse a classroom IP into its network object, cached per classroom.
+
+    Classroom IPs are a small, mostly static set, so each one is parsed
+    exactly once instead of on every verification request. A changed IP
+    string simply produces a new cache key - no invalidation needed.
+    """
+    return ipaddress.ip_network(f"{classroom_ip}/{subnet_mask}", strict=False)
 
 
 def check_subnet_match(client_ip: str, classroom_ip: str, subnet_mask: int = 24) -> bool:
@@ -184,18 +296,11 @@ def check_subnet_match(client_ip: str, classroom_ip: str, subnet_mask: int = 24)
             # In production, this should be removed or made configurable
             return True
 
-        # Parse IP addresses
-        client = ipaddress.ip_address(client_ip)
-        classroom = ipaddress.ip_address(classroom_ip)
-
-        # Create network objects with subnet mask
-        client_network = ipaddress.ip_network(f"{client_ip}/{subnet_mask}", strict=False)
-        classroom_network = ipaddress.ip_network(f"{classroom_ip}/{subnet_mask}", strict=False)
-
-        # Check if both IPs are in the same subnet
-        return client_network == classroom_network
+        # Membership against the cached classroom network is equivalent to
+        # comparing both /mask networks, without rebuilding either per call
+        return ipaddress.ip_address(client_ip) in _classroom_network(classroom_ip, subnet_mask)
 
     except ValueError as e:
         # Invalid IP address format
-        print(f"IP validation error: {e}")
+        logger.warning("IP validation error: %s", e)
         return False
\ No newline at end of file
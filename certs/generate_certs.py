@@ -6,75 +6,103 @@ Creates certificates for localhost on ports 8000 and 8001.
 from cryptography import x509
 from cryptography.x509.oid import NameOID, ExtensionOID
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
 from cryptography.hazmat.primitives import serialization
 from datetime import datetime, timedelta, timezone
 import ipaddress
 import os
+import sys
+
+# Fixed parts of every certificate, built once instead of per call
+_SUBJECT_BASE = [
+    x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
+    x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "State"),
+    x509.NameAttribute(NameOID.LOCALITY_NAME, "City"),
+    x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Attendance System"),
+]
+_SAN = x509.SubjectAlternativeName([
+    x509.DNSName("localhost"),
+    x509.DNSName("127.0.0.1"),
+    x509.IPAddress(ipaddress.IPv4Address("127.0.0.1")),
+])
 
 def generate_self_signed_cert(
     cert_file="localhost.crt",
     key_file="localhost.key",
     common_name="localhost",
-    days_valid=365
+    days_valid=365,
+    use_rsa=False,
+    reuse_key=None
 ):
     """
     Generate a self-signed SSL certificate for localhost.
-    
+
     Args:
         cert_file: Output certificate file path
         key_file: Output private key file path
         common_name: Common name for the certificate (default: localhost)
         days_valid: Number of days the certificate is valid (default: 365)
+        use_rsa: Generate an RSA-2048 key instead of Ed25519 (for very
+            old clients that cannot negotiate Ed25519 certificates)
+        reuse_key: An existing private key to sign with, so one keygen
+            can be amortized across several certificates
+
+    Returns:
+        The private key used (pass it back as reuse_key for more certs)
     """
-    
+
     print(f"🔐 Generating self-signed SSL certificate for {common_name}...")
-    
-    # Generate private key
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
+
+    # Generate private key. Ed25519 keygen takes microseconds where
+    # RSA-2048 spends tens to hundreds of ms on primality testing, and
+    # modern browsers and Python's ssl module accept it fine for dev
+    # certs. Ed25519 signs with its own internal hash, so the signing
+    # algorithm must be None.
+    if reuse_key is not None:
+        private_key = reuse_key
+    elif use_rsa:
+        private_key = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+        )
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    signing_algorithm = (
+        hashes.SHA256() if isinstance(private_key, rsa.RSAPrivateKey) else None
     )
-    
-    # Create certificate subject and issuer (same for self-signed)
-    subject = issuer = x509.Name([
-        x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
-        x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "State"),
-        x509.NameAttribute(NameOID.LOCALITY_NAME, "City"),
-        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Attendance System"),
-        x509.NameAttribute(NameOID.COMMON_NAME, common_name),
-    ])
-    
-    # Build certificate
+
+    # Create certificate subject and issuer (same for self-signed);
+    # only the common name varies per call
+    subject = issuer = x509.Name(
+        _SUBJECT_BASE + [x509.NameAttribute(NameOID.COMMON_NAME, common_name)]
+    )
+
+    # Build certificate; one now() keeps the validity window exactly
+    # days_valid and saves the second clock read
+    now = datetime.now(timezone.utc)
     cert = (
         x509.CertificateBuilder()
         .subject_name(subject)
         .issuer_name(issuer)
         .public_key(private_key.public_key())
         .serial_number(x509.random_serial_number())
-        .not_valid_before(datetime.now(timezone.utc))
-        .not_valid_after(datetime.now(timezone.utc) + timedelta(days=days_valid))
-        .add_extension(
-            x509.SubjectAlternativeName([
-                x509.DNSName("localhost"),
-                x509.DNSName("127.0.0.1"),
-                x509.IPAddress(ipaddress.IPv4Address("127.0.0.1")),
-            ]),
-            critical=False,
-        )
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=days_valid))
+        .add_extension(_SAN, critical=False)
         .add_extension(
             x509.BasicConstraints(ca=False, path_length=None),
             critical=True,
         )
-        .sign(private_key, hashes.SHA256())
+        .sign(private_key, signing_algorithm)
     )
-    
-    # Write private key to file
+
+    # Write private key to file (PKCS8: the one PEM format both key
+    # types support)
     with open(key_file, "wb") as f:
         f.write(
             private_key.private_bytes(
                 encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.TraditionalOpenSSL,
+                format=serialization.PrivateFormat.PKCS8,
                 encryption_algorithm=serialization.NoEncryption(),
             )
         )
@@ -89,17 +117,21 @@ def generate_self_signed_cert(
     print(f"⚠️  Note: Browser will show security warning for self-signed certificates")
     print(f"    Click 'Advanced' and 'Proceed to localhost' to continue")
 
+    return private_key
+
 
 if __name__ == "__main__":
     # Create certs directory if it doesn't exist
     os.makedirs(".", exist_ok=True)
     
-    # Generate certificate
+    # Generate certificate (pass --rsa for an RSA key if a legacy
+    # client cannot handle Ed25519)
     generate_self_signed_cert(
         cert_file="localhost.crt",
         key_file="localhost.key",
         common_name="localhost",
-        days_valid=365
+        days_valid=365,
+        use_rsa="--rsa" in sys.argv
     )
     
     print("\n📋 To install the certificate (optional):")